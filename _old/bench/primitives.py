@@ -0,0 +1,291 @@
+"""
+Microbenchmarks of our core primitives
+
+Times the small types that everything else leans on (Position, Rect,
+TSignal and TSprite) over realistic call counts. Results are written as
+JSON and can be compared against a saved baseline, flagging anything
+that has slowed down beyond a threshold.
+
+    python -m spaceman.bench.primitives [name ...] [--save out.json]
+                                        [--baseline base.json] [--threshold 0.1]
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import sys
+import json
+import timeit
+import argparse
+import platform
+
+import arcade
+import PIL.Image
+
+from ..core.utils import Position, Rect
+from ..core.tobject import TObject, TSignal, EventQueue
+from ..core.abstract import TSprite
+from ..core.animation import AnimationClock
+
+# Times each benchmark is repeated (we keep the fastest)
+REPEAT = 5
+
+# Allowed slow down before we call it a regression (10%)
+DEFAULT_THRESHOLD = 0.10
+
+# name -> (setup, calls per repeat)
+_BENCHMARKS = {}
+
+def benchmark(name: str, calls: int):
+    """
+    Register a benchmark. The decorated function does any setup and
+    returns the zero argument callable to time.
+    :param name: Unique name of the benchmark
+    :param calls: How many times to call it per repeat
+    """
+    def _register(setup):
+        if name in _BENCHMARKS:
+            raise RuntimeError(f"Duplicate benchmark name: {name}")
+        _BENCHMARKS[name] = (setup, calls)
+        return setup
+    return _register
+
+# -- Position
+
+@benchmark('position_add', 200000)
+def _position_add():
+    a, b = Position(1.5, 2.5), Position(0.25, -0.5)
+    return lambda: a + b
+
+@benchmark('position_sub', 200000)
+def _position_sub():
+    a, b = Position(1.5, 2.5), Position(0.25, -0.5)
+    return lambda: a - b
+
+@benchmark('position_mul_scalar', 200000)
+def _position_mul_scalar():
+    a = Position(1.5, 2.5)
+    return lambda: a * 0.5
+
+@benchmark('position_mul_position', 200000)
+def _position_mul_position():
+    a, b = Position(1.5, 2.5), Position(0.25, -0.5)
+    return lambda: a * b
+
+@benchmark('position_unpack', 200000)
+def _position_unpack():
+    a = Position(1.5, 2.5)
+    def _unpack():
+        x, y = a
+    return _unpack
+
+@benchmark('position_drag_calculation', 200000)
+def _position_drag_calculation():
+    speed, drag = Position(0, 0), Position(0.02, 0.02)
+    def _drag():
+        speed.x = 3.0
+        speed.y = -3.0
+        speed.drag_calculation(drag)
+    return _drag
+
+@benchmark('position_clamp_scalar', 200000)
+def _position_clamp_scalar():
+    a = Position(12.0, -12.0)
+    return lambda: a.clamp(-10, 10)
+
+@benchmark('position_clamp_position', 200000)
+def _position_clamp_position():
+    a = Position(12.0, -12.0)
+    low, high = Position(-10, -5), Position(10, 5)
+    return lambda: a.clamp(low, high)
+
+# -- Rect
+
+@benchmark('rect_contains', 200000)
+def _rect_contains():
+    rect = Rect(10, 10, 200, 100)
+    inside, outside = Position(50, 50), Position(500, 50)
+    def _contains():
+        rect.contains(inside)
+        rect.contains(outside)
+    return _contains
+
+# -- TSignal
+
+class _Sender(TObject):
+    @TSignal
+    def changed(self, value):
+        pass
+
+    @TSignal.queued
+    def hit(self, value):
+        pass
+
+class _Receiver(object):
+    def on_value(self, value):
+        pass
+
+@benchmark('tsignal_call', 100000)
+def _tsignal_call():
+    sender = _Sender()
+    receivers = [_Receiver() for _ in range(3)]
+    for receiver in receivers:
+        sender.changed.listen_pre(receiver.on_value)
+        sender.changed.listen_post(receiver.on_value)
+
+    def _call():
+        sender.changed(1)
+    _call.receivers = receivers # Keep our listeners alive
+    return _call
+
+@benchmark('tsignal_queued', 100000)
+def _tsignal_queued():
+    sender = _Sender()
+    receiver = _Receiver()
+    sender.hit.listen_post(receiver.on_value)
+    queue = EventQueue()
+
+    def _call():
+        # A few hits a frame, drained once
+        sender.hit(1)
+        sender.hit(2)
+        queue.drain()
+    _call.receiver = receiver
+    return _call
+
+# -- TSprite
+
+def _textures(count: int) -> list:
+    return [
+        arcade.Texture(
+            f"bench-{i}", PIL.Image.new('RGBA', (32, 32), (i, 0, 0, 255))
+        ) for i in range(count)
+    ]
+
+@benchmark('tsprite_update', 50000)
+def _tsprite_update():
+    frames = _textures(4)
+    sprite = TSprite({
+        TSprite.BASE_STATE: frames[0],
+        'life-thrust': frames
+    })
+    sprite.set_sprite_state('life-thrust')
+    return sprite.update
+
+@benchmark('tsprite_set_position', 100000)
+def _tsprite_set_position():
+    sprite = TSprite({TSprite.BASE_STATE: _textures(1)[0]})
+    position = Position(120.0, 80.0)
+    return lambda: sprite.set_position(position)
+
+@benchmark('tsprite_set_state', 100000)
+def _tsprite_set_state():
+    frames = _textures(4)
+    sprite = TSprite({
+        TSprite.BASE_STATE: frames[0],
+        'life-thrust': frames
+    })
+    def _toggle():
+        sprite.set_sprite_state('life-thrust')
+        sprite.set_sprite_state(TSprite.BASE_STATE)
+    return _toggle
+
+@benchmark('animation_clock_advance', 10000)
+def _animation_clock_advance():
+    # A fleet worth of engine blooms sharing one animation
+    frames = _textures(4)
+    sprites = [
+        TSprite({TSprite.BASE_STATE: frames[0], 'life-thrust': frames})
+        for _ in range(200)
+    ]
+    for sprite in sprites:
+        sprite.set_sprite_state('life-thrust')
+
+    clock = AnimationClock()
+    def _advance():
+        clock.advance(1 / 60)
+    _advance.sprites = sprites
+    return _advance
+
+def run(names: list = None) -> dict:
+    """
+    Run our benchmarks
+    :param names: list[str] of benchmarks to run (all when None)
+    :return: dict of name -> {calls, ns_per_call}
+    """
+    results = {}
+    for name in (names or _BENCHMARKS):
+        if name not in _BENCHMARKS:
+            raise RuntimeError(f"Unknown benchmark: {name}")
+
+        setup, calls = _BENCHMARKS[name]
+        timer = timeit.Timer(setup())
+        best = min(timer.repeat(repeat=REPEAT, number=calls))
+        results[name] = {
+            'calls': calls,
+            'ns_per_call': best / calls * 1e9,
+        }
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """
+    :return: dict of name -> ratio (current / baseline) for every
+    benchmark that slowed down by more than threshold
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = result['ns_per_call'] / baseline[name]['ns_per_call']
+        result['baseline_ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions[name] = ratio
+    return regressions
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        'names', nargs='*',
+        help=f"Benchmarks to run (all by default): {', '.join(_BENCHMARKS)}"
+    )
+    parser.add_argument('--save', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Results file to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Allowed slow down before flagging a regression (0.1 = 10%%)'
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        results = run(args.names)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+
+    for name, result in results.items():
+        line = f"{name:<28} {result['ns_per_call']:10.1f} ns/call"
+        if 'baseline_ratio' in result:
+            line += f" | {result['baseline_ratio']:5.2f}x baseline"
+        if name in regressions:
+            line += " | REGRESSION"
+        print (line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2)
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Headless simulation scenarios
+
+Spawns a fleet of ships from our prototypes and steps the Simulation
+for a fixed number of ticks without opening a window (no GL context
+required). Each scenario reports ticks per second, p50/p99 tick time
+and peak traced memory.
+
+    python -m spaceman.bench.scenarios [scenario ...] [--ticks N] [--json out.json]
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tracemalloc
+
+from ..core.utils import Position
+from ..core.ship import Ship
+from ..core.render import RenderEngine
+from ..core.component import ComponentManager
+from ..core.simulation import Simulation
+from ..core.tobject import EventQueue
+
+# name -> (ship count, firing hardpoints per ship)
+SCENARIOS = {
+    'idle':     (50, 0),
+    'patrol':   (200, 0),
+    'skirmish': (20, 1),
+    'barrage':  (100, 1),
+}
+
+DEFAULT_TICKS = 600
+
+def _data_path() -> str:
+    return os.path.join(
+        os.path.dirname(
+            os.path.dirname(
+                os.path.dirname(os.path.abspath(__file__))
+            )
+        ),
+        'data'
+    )
+
+def load_components(data_path: str = None):
+    """
+    Load every prototype through the ComponentManager (once)
+    """
+    data_path = data_path or _data_path()
+    RenderEngine().set_data_directory(data_path)
+    ComponentManager(data_path).load()
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    :return: The nearest rank percentile of samples
+    """
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+def build_fleet(simulation: Simulation,
+                ship_count: int,
+                firing: int,
+                prototype: str = 'Skalk'):
+    """
+    Spawn ship_count ships on a grid, thrusting and turning, with the
+    first `firing` bullet hardpoints of each ship held down
+    """
+    columns = max(1, int(math.sqrt(ship_count)))
+    for i in range(ship_count):
+        ship = Ship.new_ship(
+            prototype,
+            position=Position((i % columns) * 120, (i // columns) * 120)
+        )
+        ship.add_to_scene()
+        simulation.add_ship(ship)
+
+        ship.set_thrust(Position(0, 0.15))
+        ship.set_angle_delta(3 if i % 2 else -3)
+
+        armed = [sh for sh in ship.hardpoints if sh.hardpoint][:firing]
+        for sh in armed:
+            sh.fire()
+
+def run_scenario(name: str,
+                 ship_count: int,
+                 firing: int,
+                 ticks: int = DEFAULT_TICKS) -> dict:
+    """
+    Run a single scenario
+    :return: dict of results
+    """
+    simulation = Simulation()
+    queue = EventQueue()
+
+    tracemalloc.start()
+    build_fleet(simulation, ship_count, firing)
+
+    step_time = simulation.step_time
+
+    samples = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick = time.perf_counter()
+        simulation.step(step_time)
+        # What the window does before each draw
+        queue.drain()
+        samples.append(time.perf_counter() - tick)
+    total = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    simulation.clear()
+
+    return {
+        'scenario': name,
+        'ships': ship_count,
+        'firing': firing,
+        'ticks': ticks,
+        'ticks_per_second': ticks / total if total else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'peak_memory_kb': peak / 1024,
+    }
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        'scenarios', nargs='*',
+        help=f"Scenarios to run (all by default): {', '.join(SCENARIOS)}"
+    )
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS)
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args(argv)
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"Unknown scenario: {name}")
+
+    load_components()
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        ship_count, firing = SCENARIOS[name]
+        result = run_scenario(name, ship_count, firing, args.ticks)
+        results.append(result)
+        print (
+            f"{name:<10} {ship_count:>4} ships {firing} firing | "
+            f"{result['ticks_per_second']:8.1f} ticks/s | "
+            f"p50 {result['p50_ms']:6.2f}ms p99 {result['p99_ms']:6.2f}ms | "
+            f"peak {result['peak_memory_kb']:8.1f}KB"
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,13 @@
 
-import os
-import re
+import math
 import arcade
 from purepy import PureVirtualMeta, pure_virtual
 
-from .utils import Position
+from .utils import Position, Rect, FRAME_RATE
 from . import settings
+from .textures import TextureCache
+from .manifest import AssetManifest
+from .animation import AnimationClock
 
 class DrawEvent(object):
     """
@@ -42,17 +44,36 @@ class TSprite(arcade.Sprite):
         self._states = states
         self._state = None
 
-        # Animation Controls
-        self._frame = 0
-        self._texture_index = 0
-        self._texture_change_frames = settings.get_setting(
+        # Seconds each frame of an animated state is shown for (see
+        # AnimationClock)
+        self._frame_time = settings.get_setting(
             'frames_between_change', 5
-        )
+        ) / FRAME_RATE
 
         self.set_sprite_state(self.BASE_STATE)
 
+    def release_textures(self):
+        """
+        Hand the textures of all our states back to the TextureCache.
+        Call this when the sprite is being thrown away for good.
+        """
+        for info in self._states.values():
+            textures = info if isinstance(info, list) else [info]
+            for texture in textures:
+                TextureCache().release(texture)
+        self._states = {}
+        AnimationClock().unregister(self)
+
     def set_frame_rate(self, frames):
-        self._texture_change_frames = frames
+        """
+        :param frames: Frames (at FRAME_RATE) each animation frame is
+        shown for
+        """
+        self._frame_time = frames / FRAME_RATE
+        if self._state is not None and self.current_state_is_animated():
+            self.texture = AnimationClock().register(
+                self, self.get_state_info(), self._frame_time
+            )
 
     def set_position(self, position: Position):
         self.center_x = position.x
@@ -82,7 +103,6 @@ class TSprite(arcade.Sprite):
         if self._state == state:
             return
 
-        self._frame = 0
         if state in self._states:
             # Only if we have the state do we move into it.
             # No sense is failing hard
@@ -92,27 +112,15 @@ class TSprite(arcade.Sprite):
 
         # Make sure we set the initial texture
         info = self.get_state_info()
-        if isinstance(info, list):
-            self.texture = info[0] # Animated
+        if isinstance(info, list) and len(info) > 1:
+            # Animated - the clock flips our frames from here
+            self.texture = AnimationClock().register(
+                self, info, self._frame_time
+            )
         else:
-            self.texture = info
-
-    def update(self):
-        """
-        We update the TSprite based on the animation
-        """
-        super().update()
+            AnimationClock().unregister(self)
+            self.texture = info[0] if isinstance(info, list) else info
 
-        state_info = self.get_state_info()
-        if isinstance(state_info, list) and len(state_info) > 1:
-            # Animation!
-            if self._frame % self._texture_change_frames == 0:
-                self._texture_index += 1
-                if self._texture_index >= len(state_info):
-                    self._texture_index = 0
-                self.texture = state_info[self._texture_index]
-            self._frame += 1
-        # else we have nothing to change
 
 class _AbstractDrawObject(metaclass=PureVirtualMeta):
     """
@@ -124,8 +132,6 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
     PAINT_BASED  = 0x00000010
     SHAPE_BASED  = 0x00000100
 
-    ANIM_REGEX = re.compile(r"^(?P<name>.+)_(?P<frame>\d+)\.png$")
-
     def __init__(self):
         self._position = Position(0, 0)
         self._velocity = Position(0, 0)
@@ -135,6 +141,12 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
         self._sprite = None
         self._is_in_scene = False
 
+        # Shape based objects flag this when their shapes change
+        self._dirty = True
+
+        # Hidden objects stay in the scene but aren't drawn
+        self._visible = True
+
     @property
     def position(self):
         return self._position
@@ -147,9 +159,49 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
     def is_in_scene(self):
         return self._is_in_scene
 
+    @property
+    def visible(self):
+        return self._visible
+
+    def set_visible(self, visible: bool):
+        """
+        Show or hide this object without taking it out of the scene.
+        Sprites are hidden through their alpha so they keep their slot
+        in the render layer's SpriteList. Paint and shape based objects
+        are skipped by the layer.
+        :param visible: Boolean if we should be drawn
+        :return: None
+        """
+        if self._visible == visible:
+            return
+
+        self._visible = visible
+        if self._sprite is not None:
+            self._sprite.alpha = 255 if visible else 0
+
+        if self.is_in_scene and \
+           self.draw_method() & _AbstractDrawObject.SHAPE_BASED:
+            from .render import RenderEngine
+            RenderEngine().invalidate_shapes(self.z_depth)
+
     def sprite(self):
         return self._retrieve_sprite_pvt()
 
+    def bounds(self) -> Rect:
+        """
+        :return: Rect that fully contains our sprite at any angle or None
+        if we have no sprite to speak of
+        """
+        if not self.draw_method() & _AbstractDrawObject.SPRITE_BASED:
+            return None
+
+        s = self.sprite()
+        # The diagonal covers every corner however we're turned
+        size = math.hypot(s.width, s.height)
+        return Rect(
+            s.center_x - (size / 2), s.center_y - (size / 2), size, size
+        )
+
     def data_directory(self) -> str:
         """
         :return: The root of our data path containing any game data
@@ -174,14 +226,66 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
         """
         Set when adding this to the render engine for rendering.
 
-        Unset when we're done with it
+        Our sprite outlives leaving the scene (we're often back soon).
+        Use teardown() once we're done with it for good.
         :param in_scene: Boolean if we're in the scene
         :return: None
         """
         self._is_in_scene = in_scene
 
+    def teardown(self):
+        """
+        We're done with this object. Pull it from the scene and hand
+        our sprite's textures back to the TextureCache.
+        :return: None
+        """
+        if self.is_in_scene:
+            self.remove_from_scene()
+        self.release_sprite()
+
+    def release_sprite(self):
+        """
+        Hand the textures of our sprite back to the TextureCache and
+        forget it. It's loaded again if we're ever drawn again.
+        :return: None
+        """
+        if isinstance(self._sprite, TSprite):
+            self._sprite.release_textures()
+        self._sprite = None
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def set_dirty(self, dirty: bool):
+        """
+        Shape based objects call this when their shapes() would return
+        something new. The render engine then rebuilds the cached shapes
+        for our layer on the next draw.
+        :param dirty: Boolean if our shapes have changed
+        :return: None
+        """
+        self._dirty = dirty
+        if dirty and self.is_in_scene and \
+           self.draw_method() & _AbstractDrawObject.SHAPE_BASED:
+            from .render import RenderEngine
+            RenderEngine().invalidate_shapes(self.z_depth)
+
     def set_position(self, position: Position):
-        self._position = position
+        """
+        Copy position into our own (we never hold on to the caller's)
+        """
+        self._position.set(position.x, position.y)
+
+    def moved(self):
+        """
+        Let the render engine know our sprite has moved so it can keep
+        it's culling index up to date
+        """
+        if self._is_in_scene and \
+           self.draw_method() & _AbstractDrawObject.SPRITE_BASED:
+            from .render import RenderEngine
+            RenderEngine().moved(self)
 
     def set_x(self, x: int):
         self._position.x = x
@@ -210,57 +314,19 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
 
     def build_states(self, texture_dir: str) -> dict:
         """
-        Construct a state dictionary
+        Construct a state dictionary (see AssetManifest.states)
         """
         scale = settings.get_setting('global_scale', 1.0)
         states = {}
 
-        folders = filter(
-            lambda x: os.path.isdir(
-                os.path.join(texture_dir, x)
-            ),
-            os.listdir(texture_dir)
-        )
-
-        for folder in folders:
-
-            this_dirname = os.path.join(texture_dir, folder)
-
-            files = filter(
-                lambda x: os.path.isfile(
-                     os.path.join(this_dirname, x)
-                ),
-                os.listdir(this_dirname)
-            )
-
-            textures = filter(lambda x: x.endswith(".png"), files)
-
-            animations = set()
-            for texture in textures:
-
-                anim_match = re.match(self.ANIM_REGEX, texture)
-                is_anim = anim_match is not None
-
-                name = texture[:-4] # Strip .png
-                if anim_match:
-                    d = anim_name.groupdict()
-                    # Check if we've seen this animation before
-                    name = d['name']
-                    if name in animations:
-                        continue
-                    animations.add(name)
-
-                loaded_texture = arcade.load_texture(
-                    os.path.join(texture_dir, folder, texture),
-                    scale=scale
-                )
-
-                state_name = f"{folder}-{name}"
-                states.setdefault(state_name, [])
-                if not is_anim:
-                    states[state_name] = loaded_texture
-                else:
-                    states[state_name].append(loaded_texture)
+        textures = TextureCache()
+        for state_name, info in AssetManifest().states(texture_dir).items():
+            if isinstance(info, list):
+                states[state_name] = [
+                    textures.acquire(path, scale=scale) for path in info
+                ]
+            else:
+                states[state_name] = textures.acquire(info, scale=scale)
 
         return states
 
@@ -272,20 +338,11 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
         """
         if scale is None:
             scale = settings.get_setting('global_scale', 1.0)
-        textures = []
-
-        basic = os.path.join(texture_dir, name)
-        if os.path.isfile(basic + '.png'):
-            textures.append(arcade.load_texture(
-                basic + '.png', scale=scale
-            ))
-        elif os.path.isdir(basic):
-            for filename in sorted(os.listdir(basic)):
-                if re.match(r'^' + name + r'_[\d]+\.png$', filename):
-                    textures.append(arcade.load_texture(
-                        os.path.join(basic, filename),
-                        scale=scale
-                    ))
+
+        textures = [
+            TextureCache().acquire(path, scale=scale)
+            for path in AssetManifest().frames(texture_dir, name)
+        ]
 
         states = {
             'life-static' : textures
@@ -330,6 +387,8 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
             return self._sprite
         else:
             self._sprite = self.load_sprite()
+            if not self._visible:
+                self._sprite.alpha = 0
         return self._sprite
 
     def paint(self, draw_event: DrawEvent):
@@ -354,3 +413,5 @@ class _AbstractDrawObject(metaclass=PureVirtualMeta):
         """
         if self.draw_method() & _AbstractDrawObject.SPRITE_BASED:
             self.sprite().update()
+            if self._velocity.x or self._velocity.y:
+                self.moved()
@@ -0,0 +1,124 @@
+"""
+Shared, time based sprite animation
+"""
+
+import weakref
+
+class _AnimationGroup(object):
+    """
+    Every sprite playing the same frames at the same speed
+    """
+    def __init__(self, frames: tuple, frame_time: float):
+        self.frames = frames
+        self.frame_time = frame_time
+        self.index = 0
+
+        # Sprites that are thrown away simply drop out
+        self.members = weakref.WeakSet()
+
+
+class AnimationClock(object):
+    """
+    Singleton that advances every animated TSprite at once.
+
+    Sprites register the frames of their current state. Sprites sharing
+    the same frames and frame time are grouped and play in step, so each
+    tick only works out the frame once per group and only touches the
+    sprites of groups whose frame actually changed.
+    """
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_groups'):
+            # (frames, frame_time) -> _AnimationGroup
+            self._groups = {}
+
+        if not hasattr(self, '_sprite_groups'):
+            # sprite -> _AnimationGroup it's in
+            self._sprite_groups = weakref.WeakKeyDictionary()
+
+        if not hasattr(self, '_time'):
+            self._time = 0.0
+
+    def __len__(self):
+        return len(self._sprite_groups)
+
+    @property
+    def time(self):
+        """
+        :return: Seconds the clock has been advanced in total
+        """
+        return self._time
+
+    @property
+    def groups(self):
+        return self._groups.values()
+
+    def register(self, sprite, frames: list, frame_time: float):
+        """
+        Animate a sprite (moving it out of any group it's already in)
+        :param sprite: The arcade.Sprite to animate
+        :param frames: list[arcade.Texture] to play
+        :param frame_time: Seconds each frame is shown for
+        :return: The texture the sprite should be showing right now
+        """
+        key = (tuple(frames), frame_time)
+
+        group = self._sprite_groups.get(sprite)
+        if group is not None:
+            if (group.frames, group.frame_time) == key:
+                return group.frames[group.index]
+            self.unregister(sprite)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = _AnimationGroup(*key)
+            group.index = self._index(group)
+            self._groups[key] = group
+
+        group.members.add(sprite)
+        self._sprite_groups[sprite] = group
+        return group.frames[group.index]
+
+    def unregister(self, sprite):
+        """
+        Stop animating a sprite
+        """
+        group = self._sprite_groups.pop(sprite, None)
+        if group is None:
+            return
+
+        group.members.discard(sprite)
+        if not group.members:
+            del self._groups[(group.frames, group.frame_time)]
+
+    def _index(self, group: _AnimationGroup) -> int:
+        return int(self._time / group.frame_time) % len(group.frames)
+
+    def advance(self, delta_time: float):
+        """
+        Move time along and flip the frame of any group that's due
+        :param delta_time: Seconds since we last advanced
+        :return: None
+        """
+        self._time += delta_time
+
+        for key, group in list(self._groups.items()):
+            if not group.members:
+                # Every sprite was thrown away
+                del self._groups[key]
+                continue
+
+            index = self._index(group)
+            if index == group.index:
+                continue
+
+            group.index = index
+            texture = group.frames[index]
+            for sprite in group.members:
+                sprite.texture = texture
@@ -0,0 +1,243 @@
+"""
+Packed asset archive
+
+Walking the data tree and opening hundreds of small images is most of
+our cold start on slow disks. The build step here packs the whole tree
+into a single file:
+
+    header  | magic, version, index offset, index length
+    pixels  | decoded RGBA pixels of every image (16 byte aligned)
+    index   | pickled dict of file listing, image locations, sprite
+            | sheet descriptors and the validated prototypes
+
+At runtime the archive is memory-mapped and images are handed out as
+PIL images that point straight into the map (no copy, no decode).
+
+To build:
+
+    python -m spaceman.core.archive <data directory> <archive file>
+"""
+
+import os
+import sys
+import mmap
+import struct
+import pickle
+
+import PIL.Image
+
+from .protocache import PrototypeCache, read_info
+from .textures import decode_image
+from .sheet import SpriteSheet, SHEET_EXT
+
+_MAGIC = b'SPAK'
+_HEADER = struct.Struct('<4sIQQ')
+_ALIGN = 16
+
+# Stand in for the data directory within archived prototypes
+_DATA_TOKEN = '$DATA'
+
+def _relative(path: str, root: str) -> str:
+    """
+    :return: The archive key of a path (relative with forward slashes)
+    """
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+def _rebase(obj, old: str, new: str):
+    """
+    Swap the root of any paths found within a prototype
+    :return: A copy of obj with the paths moved from old to new
+    """
+    if isinstance(obj, str):
+        if obj == old or obj.startswith(old + os.sep):
+            return os.path.join(new, os.path.relpath(obj, old))
+        return obj
+    if isinstance(obj, dict):
+        return {k: _rebase(v, old, new) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_rebase(v, old, new) for v in obj]
+    return obj
+
+
+class AssetArchive(object):
+    """
+    Read only, memory-mapped view of an archive from build_archive()
+
+    This also stands in for a PrototypeCache (see fetch()) so prototypes
+    register without being parsed or validated.
+    """
+    VERSION = 2
+
+    def __init__(self, archive_file: str, data_directory: str):
+        self._archive_file = archive_file
+        self._data_directory = os.path.abspath(data_directory)
+
+        self._file = open(archive_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, offset, length = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != AssetArchive.VERSION:
+            self.close()
+            raise RuntimeError(f"{archive_file} is not a valid asset archive")
+
+        index = pickle.loads(self._map[offset:offset + length])
+        self._files = index['files']
+        self._images = index['images']
+        self._prototypes = index['prototypes']
+        self._sheets = index['sheets']
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @property
+    def files(self):
+        """
+        :return: list[str] of every file within the data tree (as archive keys)
+        """
+        return self._files
+
+    def path(self, key: str) -> str:
+        """
+        :return: The full path of an archive key
+        """
+        return os.path.join(self._data_directory, *key.split('/'))
+
+    def has_image(self, path: str) -> bool:
+        return _relative(path, self._data_directory) in self._images
+
+    def image(self, path: str) -> PIL.Image.Image:
+        """
+        :return: PIL.Image backed by our memory map or None if we don't
+        know the image
+        """
+        location = self._images.get(_relative(path, self._data_directory))
+        if location is None:
+            return None
+
+        offset, width, height = location
+        pixels = memoryview(self._map)[offset:offset + (width * height * 4)]
+        return PIL.Image.frombuffer(
+            'RGBA', (width, height), pixels, 'raw', 'RGBA', 0, 1
+        )
+
+    def sheets(self) -> dict:
+        """
+        :return: dict of archive key -> validated descriptor for every
+        .sheet file (see AssetManifest.scan)
+        """
+        return self._sheets
+
+    def prototype_files(self) -> dict:
+        """
+        :return: The same as ComponentManager.prototype_files() without
+        looking at the disk
+        """
+        files = self._prototypes['files']
+        return {
+            'hardpoints': [self.path(k) for k in files['hardpoints']],
+            'engines': [self.path(k) for k in files['engines']],
+            'ships': [(name, self.path(k)) for name, k in files['ships']],
+        }
+
+    def fetch(self, source: str, validate, depends = None):
+        """
+        PrototypeCache interface. Archived prototypes were validated when
+        the archive was built (against the files packed with them).
+        """
+        key = _relative(source, self._data_directory)
+        if key not in self._prototypes['data']:
+            return validate(read_info(source))
+
+        return _rebase(
+            self._prototypes['data'][key], _DATA_TOKEN, self._data_directory
+        )
+
+
+def build_archive(data_directory: str, archive_file: str):
+    """
+    Pack a data tree into an archive
+    :param data_directory: The root of our game data
+    :param archive_file: Where to write the archive
+    :return: None
+    """
+    from .component import ComponentManager
+
+    data_directory = os.path.abspath(data_directory)
+
+    # -- Validate all of our prototypes
+    manager = ComponentManager(data_directory)
+    cache = PrototypeCache('') # Never saved
+    prototype_files = manager.prototype_files()
+    manager.register_prototypes(prototype_files, cache)
+
+    sources = prototype_files['hardpoints'] + prototype_files['engines'] + \
+              [f for _, f in prototype_files['ships']]
+
+    prototypes = {
+        'files': {
+            'hardpoints': [
+                _relative(f, data_directory) for f in prototype_files['hardpoints']
+            ],
+            'engines': [
+                _relative(f, data_directory) for f in prototype_files['engines']
+            ],
+            'ships': [
+                (name, _relative(f, data_directory))
+                for name, f in prototype_files['ships']
+            ],
+        },
+        'data': {
+            _relative(f, data_directory): _rebase(
+                cache.data(f), data_directory, _DATA_TOKEN
+            ) for f in sources
+        }
+    }
+
+    # -- Gather the tree
+    files = []
+    for root, dirs, filenames in os.walk(data_directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        files.extend(
+            _relative(os.path.join(root, f), data_directory)
+            for f in sorted(filenames)
+        )
+
+    sheets = {
+        key: SpriteSheet.validate_info(
+            key, read_info(os.path.join(data_directory, *key.split('/')))
+        ) for key in files if key.endswith(SHEET_EXT)
+    }
+
+    images = {}
+    with open(archive_file, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, AssetArchive.VERSION, 0, 0))
+
+        for key in files:
+            if not key.endswith('.png'):
+                continue
+
+            image = decode_image(os.path.join(data_directory, *key.split('/')))
+            f.write(b'\0' * (-f.tell() % _ALIGN))
+            images[key] = (f.tell(), image.width, image.height)
+            f.write(image.tobytes())
+
+        index = pickle.dumps({
+            'files': files,
+            'images': images,
+            'sheets': sheets,
+            'prototypes': prototypes,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        offset = f.tell()
+        f.write(index)
+
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, AssetArchive.VERSION, offset, len(index)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print ("Usage: python -m spaceman.core.archive <data> <archive>")
+        sys.exit(1)
+    build_archive(sys.argv[1], sys.argv[2])
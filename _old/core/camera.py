@@ -0,0 +1,83 @@
+"""
+World space camera
+"""
+
+import arcade
+
+from .utils import Position, Rect
+
+class Camera(object):
+    """
+    The window onto our world. The scene is drawn with the camera's
+    viewport while the interface stays in screen space.
+    """
+    def __init__(self, width: (int, float), height: (int, float)):
+        # World position of the bottom left of the screen
+        self._position = Position(0, 0)
+        self._size = Position(width, height)
+
+    def __repr__(self):
+        return f"<(Camera, {self.view()})>"
+
+    @property
+    def position(self) -> Position:
+        return self._position
+
+    @property
+    def size(self) -> Position:
+        return self._size
+
+    def resize(self, width: (int, float), height: (int, float)):
+        """
+        Match the size of the window (keeping our center where it is)
+        """
+        center = self.view().center()
+        self._size.set(width, height)
+        self.center_on(center.x, center.y)
+
+    def set_position(self, position: Position):
+        """
+        :param position: The world position of the bottom left of the screen
+        """
+        self._position.set(position.x, position.y)
+
+    def center_on(self, x: (int, float), y: (int, float)):
+        """
+        Put a world position in the middle of the screen
+        """
+        self._position.set(x - (self._size.x / 2), y - (self._size.y / 2))
+
+    def view(self, margin: (int, float) = 0) -> Rect:
+        """
+        :param margin: Extra space around the screen to include
+        :return: Rect of the world that's on screen
+        """
+        return Rect(
+            self._position.x - margin,
+            self._position.y - margin,
+            self._size.x + (margin * 2),
+            self._size.y + (margin * 2)
+        )
+
+    def to_world(self, x: (int, float), y: (int, float)) -> Position:
+        """
+        :return: The world position of a point on screen (e.g. the mouse)
+        """
+        return Position(x + self._position.x, y + self._position.y)
+
+    def apply(self):
+        """
+        Draw the scene from our point of view
+        """
+        arcade.set_viewport(
+            self._position.x,
+            self._position.x + self._size.x,
+            self._position.y,
+            self._position.y + self._size.y
+        )
+
+    def apply_screen(self):
+        """
+        Draw in screen space (e.g. the interface)
+        """
+        arcade.set_viewport(0, self._size.x, 0, self._size.y)
@@ -37,8 +37,8 @@ class Campaign(object):
             Ship.new_ship("Skalk", position=Position(250, 230))
         )
         player.ship.add_to_scene()
+        window.simulation.add_ship(player.ship)
 
-        # Bit of a performance drag... need to know why
         from ..draw.starfield import Starfield
         self._background = Starfield(window)
         RenderEngine().add_object(self._background)
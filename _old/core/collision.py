@@ -0,0 +1,114 @@
+"""
+Tools for finding out what's hitting what
+"""
+
+import numpy
+import arcade
+
+from . import settings
+from .damage import Damage
+from .spatial import SpatialHash
+from .projectile import ProjectileEngine
+
+class CollisionEngine(object):
+    """
+    Singleton that tests projectiles against the hulls in the scene.
+
+    Hulls are kept in a SpatialHash (the broad phase) that's updated each
+    tick. Projectiles only look at hulls in the cell they're in and we only
+    check the hit box (the narrow phase) for those few candidates.
+    """
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_hulls'):
+            # Insertion ordered set of hulls
+            self._hulls = {}
+
+        if not hasattr(self, '_grid'):
+            self._grid = SpatialHash(
+                settings.get_setting('collision_cell_size', 128)
+            )
+
+    @property
+    def grid(self):
+        return self._grid
+
+    def add_hull(self, hull):
+        """
+        Add an object that can be hit. It must provide bounds(), sprite()
+        and take_damage(Damage)
+        """
+        self._hulls[hull] = None
+        self._grid.insert(hull, hull.bounds())
+
+    def remove_hull(self, hull):
+        self._hulls.pop(hull, None)
+        self._grid.remove(hull)
+
+    def update(self, delta_time):
+        """
+        Refresh the broad phase and test every live projectile
+        """
+        for hull in self._hulls:
+            self._grid.move(hull, hull.bounds())
+
+        if not self._hulls:
+            return
+
+        #
+        # Encode each occupied cell as a single integer so we can
+        # filter projectiles with one vectorized lookup
+        #
+        occupied = numpy.array(
+            [(cx << 32) + cy for cx, cy in self._grid.cells()],
+            dtype=numpy.int64
+        )
+
+        for batch in ProjectileEngine().batches.values():
+            self._test_batch(batch, occupied)
+
+    def _test_batch(self, batch, occupied):
+        """
+        Find the projectiles within a batch that have hit something
+        and deal their damage
+        """
+        n = batch.count
+        if not n:
+            return
+
+        cells = numpy.floor(
+            batch.position[:n] / self._grid.cell_size
+        ).astype(numpy.int64)
+        keys = (cells[:, 0] << 32) + cells[:, 1]
+
+        candidates = numpy.flatnonzero(numpy.isin(keys, occupied))
+        if not len(candidates):
+            return
+
+        engine = ProjectileEngine()
+        hits = []
+        for i in candidates.tolist():
+            x, y = batch.position[i].tolist()
+            cell = (int(cells[i, 0]), int(cells[i, 1]))
+            owner = engine.owner(int(batch.owner[i]))
+
+            for hull in self._grid.query_cell(cell):
+                if hull is getattr(owner, 'ship', None):
+                    continue # Don't shoot ourselves
+
+                points = hull.sprite().get_points()
+                if not arcade.is_point_in_polygon(x, y, points):
+                    continue
+
+                hull.take_damage(Damage(Damage.PIERCE, float(batch.damage[i])))
+                hits.append(i)
+                break
+
+        if hits:
+            batch.kill(hits)
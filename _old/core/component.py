@@ -3,14 +3,20 @@ Component manger
 """
 
 import os
-import yaml
 import arcade
 
+from concurrent.futures import ThreadPoolExecutor
+
 from .hardpoint import Hardpoint
 from .engine import Engine
 from .player import Player
 from .ship import Ship
-from .projectile import Bullet
+from .projectile import ProjectileEngine
+from .protocache import PrototypeCache
+from .textures import TextureCache, decode_image
+from .archive import AssetArchive
+from .manifest import AssetManifest
+from . import settings
 
 class ComponentManager(object):
     """
@@ -42,40 +48,169 @@ class ComponentManager(object):
     def bullet_data(self):
         return os.path.join(self._data_path, 'components', 'bullets')
 
-    def load(self):
+    @property
+    def cache_data(self):
+        return os.path.join(self._data_path, '.cache')
+
+    def prototype_cache(self):
         """
-        Load any of the dynamic data we can!
+        :return: PrototypeCache|None if it's been turned off
         """
-        # Bullets - we just set the data directory as they're
-        # purely cosmetic (minus the hitbox established via their
-        # size) - eventually we may want to handle this information
-        # in a better way.
-        Bullet.set_data_directory(self.bullet_data)
+        if not settings.get_setting('prototype_cache', True):
+            return None
+        return PrototypeCache(
+            os.path.join(self.cache_data, 'prototypes.cache')
+        )
+
+    @property
+    def image_data(self):
+        """
+        :return: list[str] of directories that hold images we decode at boot
+        """
+        return [
+            self.ships_data,
+            os.path.join(self._data_path, 'components'),
+            os.path.join(self._data_path, 'objects'),
+        ]
+
+    def _info_files(self, directory: str) -> list:
+        """
+        :return: list[str] of all .si files within directory
+        """
+        return [
+            os.path.join(directory, f)
+            for f in sorted(os.listdir(directory)) if f.endswith('.si')
+        ]
+
+    def _ship_info_files(self) -> list:
+        """
+        :return: list[tuple(str, str)] of (ship name, info file)
+        """
+        ships = []
+        d = self.ships_data
+        for ship_dir in sorted(os.listdir(d)):
+            info_file = os.path.join(d, ship_dir, 'info.si')
+            if os.path.isfile(info_file):
+                ships.append((ship_dir, info_file))
+        return ships
+
+    def _image_files(self) -> list:
+        """
+        :return: list[str] of every image we'll want as a texture
+        """
+        images = []
+        for directory in self.image_data:
+            images.extend(AssetManifest().images(directory))
+        return images
 
+    def prototype_files(self) -> dict:
+        """
+        :return: dict of every .si file we'll register, in order
+        """
+        return {
+            'hardpoints': self._info_files(self.hardpoint_data),
+            'engines': self._info_files(self.engine_data),
+            'ships': self._ship_info_files(),
+        }
+
+    def register_prototypes(self, files: dict, cache = None):
+        """
+        Validate and register our prototypes. Order matters here as ships
+        verify their default hardpoints and engines.
+        :param files: dict from prototype_files()
+        :param cache: PrototypeCache|AssetArchive|None
+        :return: None
+        """
         # Hardpoints
         d = self.hardpoint_data
-        for hardpoint_info_file in os.listdir(d):
-            if not hardpoint_info_file.endswith('.si'):
-                continue
-
-            info_file = os.path.join(d, hardpoint_info_file)
-            Hardpoint.add_info_file(info_file, d)
+        for info_file in files['hardpoints']:
+            Hardpoint.add_info_file(info_file, d, cache)
 
         # Engines
         d = self.engine_data
-        for engine_info_file in os.listdir(d):
-            if not engine_info_file.endswith('.si'):
-                continue
-
-            info_file = os.path.join(d, engine_info_file)
-            Engine.add_info_file(info_file, d)
+        for info_file in files['engines']:
+            Engine.add_info_file(info_file, d, cache)
 
         # Ships
-        d = self.ships_data
-        for ship_dir in os.listdir(d):
-            data_dir = os.path.join(d, ship_dir)
-            info_file = os.path.join(data_dir, 'info.si')
-            if not os.path.isfile(info_file):
-                continue
+        for ship_dir, info_file in files['ships']:
+            Ship.add_prototype(ship_dir, info_file, cache)
+
+    def asset_archive(self):
+        """
+        :return: AssetArchive|None if the 'asset_archive' setting doesn't
+        point to one
+        """
+        archive_file = settings.get_setting('asset_archive', None)
+        if not archive_file or not os.path.isfile(archive_file):
+            return None
+        return AssetArchive(archive_file, self._data_path)
 
-            Ship.add_prototype(ship_dir, info_file)
+    def load(self):
+        """
+        Load any of the dynamic data we can!
+        """
+        # Bullets - we just set the data directory as they're
+        # purely cosmetic (minus the hitbox established via their
+        # size) - eventually we may want to handle this information
+        # in a better way.
+        ProjectileEngine().set_data_directory(self.bullet_data)
+
+        archive = self.asset_archive()
+        if archive is not None:
+            #
+            # Everything comes pre-validated and pre-decoded from the
+            # archive - no need to go to the disk
+            #
+            AssetManifest().scan(
+                self._data_path, archive.files, archive.sheets()
+            )
+            self.register_prototypes(archive.prototype_files(), archive)
+            TextureCache().set_archive(archive)
+            return
+
+        AssetManifest().scan(self._data_path)
+        self._load_files()
+
+    def _load_files(self):
+        """
+        Load our data from the loose files of the data directory.
+
+        This happens in two stages. First, a pool of workers decodes all
+        of our images and parses any .si files that aren't already in the
+        prototype cache. Then, on the main thread, we validate/register the
+        prototypes (in a fixed order) and stage the decoded images for the
+        TextureCache to turn into textures.
+        """
+        # Validated prototypes from previous runs
+        cache = self.prototype_cache()
+        files = self.prototype_files()
+
+        workers = settings.get_setting('loader_threads', os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+
+            # -- Stage 1: Workers
+            images = [
+                (path, pool.submit(decode_image, path))
+                for path in self._image_files()
+            ]
+
+            if cache is not None:
+                cache.prefetch(
+                    files['hardpoints'] + files['engines'] + \
+                    [f for _, f in files['ships']],
+                    pool
+                )
+
+            # -- Stage 2: Main thread
+            self.register_prototypes(files, cache)
+
+            # Sprite sheets are cut into their frames here (one decode each)
+            decoded = AssetManifest().slice_sheets(
+                {path: future.result() for path, future in images}
+            )
+            textures = TextureCache()
+            for path, image in decoded.items():
+                textures.stage(path, image)
+
+        if cache is not None:
+            cache.save()
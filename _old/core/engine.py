@@ -2,17 +2,12 @@
 The engines of a ship
 """
 
-import re
 import os
-import yaml
-import arcade
-import math
 
-import numpy
-
-from . import settings
+from .protocache import read_info
 from .utils import _must_contain, Position, emap
-from .abstract import _AbstractDrawObject, TSprite
+from .sheet import SHEET_EXT
+from .abstract import _AbstractDrawObject
 
 class Engine(_AbstractDrawObject):
     """
@@ -26,6 +21,9 @@ class Engine(_AbstractDrawObject):
     # -- Known - Loaded engine descriptors
     _engine_prototypes = {}
 
+    # -- Prototype name -> the .si file it came from
+    _engine_files = {}
+
     def __init__(self, engine_info, ship_engine_info, ship):
         super().__init__()
         self._name        = engine_info['name']
@@ -36,27 +34,38 @@ class Engine(_AbstractDrawObject):
 
         self.set_z_depth(-1) # To render under ship
 
+        # Hidden until we're engaged
         self._on = False
+        self.set_visible(False)
 
     @classmethod
     def new_engine(cls, prototype: str, info: dict, ship = None):
         return cls(cls._engine_prototypes[prototype], info, ship)
 
+    @classmethod
+    def prototype_file(cls, prototype: str) -> str:
+        """
+        :return: The .si file a prototype was loaded from (or None)
+        """
+        return cls._engine_files.get(prototype)
+
     @property
     def power(self):
         return self._power
 
     def engage(self):
         """
-        "turn on" the engine. This simply adds the sprite to the
-        scene below the player.        
+        "turn on" the engine. The sprite joins the scene below the
+        player the first time and is only shown/hidden after that so
+        feathering the thrust doesn't churn the render layer.
         """
         if self._on:
             return
 
         self._on = True
-        from .render import RenderEngine
-        RenderEngine().add_object(self)
+        if not self.is_in_scene:
+            self.add_to_scene()
+        self.set_visible(True)
 
     def disengage(self):
         """
@@ -66,25 +75,56 @@ class Engine(_AbstractDrawObject):
             return
 
         self._on = False
-        from .render import RenderEngine
-        RenderEngine().unload_object(self)
+        self.set_visible(False)
 
     @classmethod
-    def add_info_file(cls, info_file: str, data_directory: str):
+    def add_info_file(cls, info_file: str, data_directory: str, cache = None):
         """
         Pick apart an engine .si file to understand our verify prototypes
+        :param info_file: The .si file
+        :param data_directory: The directory it lives in
+        :param cache: Optional PrototypeCache (or AssetArchive) to skip parsing
+        unchanged files
+        :return: None
         """
-        errors = []
-        if not os.path.isfile(info_file):
-            raise RuntimeError(
-                f"Info for {info_file} does not exist!"
-            )
+        def _validate(info):
+            return cls.validate_info(info_file, info, data_directory)
+
+        def _depends(info):
+            # Each sprite is either a directory of frames or a sheet
+            return [
+                path
+                for eg_info in info
+                for path in (eg_info['sprite'], eg_info['sprite'] + SHEET_EXT)
+            ]
+
+        if cache is not None:
+            info = cache.fetch(info_file, _validate, _depends)
+        else:
+            if not os.path.isfile(info_file):
+                raise RuntimeError(
+                    f"Info for {info_file} does not exist!"
+                )
+            info = _validate(read_info(info_file))
+
+        for eg_info in info:
+            n = eg_info['name']
+            if n in cls._engine_prototypes:
+                raise RuntimeError(f"Duplicate engine name: {n}! Must be unique!")
 
-        try:
-            with open(info_file, 'r') as f:
-                info = yaml.safe_load(f)
-        except Exception as e:
-            raise RuntimeError(str(e))
+            cls._engine_prototypes[n] = eg_info
+            cls._engine_files[n] = info_file
+
+    @classmethod
+    def validate_info(cls, info_file: str, info, data_directory: str) -> list:
+        """
+        Verify the contents of an engine .si file
+        :param info_file: The .si file (for error reporting)
+        :param info: The parsed yaml of the file
+        :param data_directory: The directory the file lives in
+        :return: list[dict] of engine descriptors
+        """
+        errors = []
 
         if not isinstance(info, list):
             raise RuntimeError(
@@ -116,14 +156,13 @@ class Engine(_AbstractDrawObject):
                     f"Unkown engine minimum_class: '{eg_info['minimum_class']}'"
                 )
 
-            if n in cls._engine_prototypes:
-                raise RuntimeError(f"Duplicate engine name: {n}! Must be unique!")
-
+            # Either a directory of frames or a sprite sheet
             eg_info['sprite'] = os.path.join(data_directory, eg_info['sprite'])
-            if not os.path.exists(eg_info['sprite']):
+            if not os.path.exists(eg_info['sprite']) and \
+               not os.path.exists(eg_info['sprite'] + SHEET_EXT):
                 raise RuntimeError(f"Sprite(s): {eg_info['sprite']} does not exist!")
 
-            cls._engine_prototypes[n] = eg_info
+        return info
 
     @classmethod
     def verify_ship_engine(cls, info, errors):
@@ -173,61 +212,61 @@ class Engine(_AbstractDrawObject):
         s.center_y = self.position.y
         return s
 
-    def update(self, draw_event):
+    def mount_offset(self, ship_center: Position, scale: (int, float)) -> tuple:
         """
-        Overload to handle keeping up with the ship
+        Our location relative to the center of the ship (unrotated). The
+        ship caches this and only asks again if the scale changes.
+        :param ship_center: Position of the center of the ship's sprite
+        :param scale: The global scale
+        :return: tuple(x, y)
         """
+        relative_location = Position(self._ship_ei['location'])
+        relative_location.imul(scale).isub(ship_center)
 
-        if not self._ship:
-            return # Nothing to draw yet
-
-        if not self._on:
-            return # Not ine the scene - nothing to render
+        if self._ship_ei['direction'] == 's':
+            relative_location.y += self.sprite().height / 2
 
-        scale = settings.get_setting('global_scale', 1.0)
+            if self._ship_ei['size'] == 'w':
+                relative_location.x += 1
 
-        #
-        # Find the relative location of the engine based on the
-        # active location and angle
-        #
-        ship_sprite = self._ship.sprite()
-        s = self.sprite()
+        return (relative_location.x, -relative_location.y)
 
-        # This should always be the same
-        s.angle = int(self._ship.angle)
-
-        # FIXME: This could be cached 
-        this_location = Position(self._ship_ei['location']) * scale
-        ship_center = Position(
-            ship_sprite.width / 2,
-            ship_sprite.height / 2,
-        )
-
-        this_sprite_center = Position(
-            s.height / 2,
-            s.height / 2
-        )
-        relative_location = this_location - ship_center
-        # -- End FIXME
-
-        rads = math.radians(self._ship.angle)
-
-        mat = numpy.array([
-            [math.cos(rads), -math.sin(rads), self._ship.position.x],
-            [math.sin(rads), math.cos(rads),  self._ship.position.y],
-            [0,              0,               1]
-        ])
+    def set_mount_position(self,
+                           x: (int, float),
+                           y: (int, float),
+                           angle: (int, float)):
+        """
+        Called by our ship once it has transformed all of it's mounts
+        :param angle: The angle of the ship we were placed with
+        """
+        self._position.set(x, y)
+        self.draw_at(x, y, angle)
 
-        if self._ship_ei['direction'] == 's':
-            relative_location.y += this_sprite_center.y
+    def draw_at(self,
+                x: (int, float),
+                y: (int, float),
+                angle: (int, float)):
+        """
+        Place our sprite without moving us (see Ship.interpolate)
+        :param angle: The angle of the ship we're drawn with
+        """
+        if not self._on:
+            return # Hidden - nothing to render
 
-            if self._ship_ei['size'] == 'w':
-                relative_location.x += 1
+        s = self.sprite()
+        s.angle = int(angle)
+        s.center_x = int(x)
+        s.center_y = int(y)
+        self.moved()
 
-        a = numpy.matmul(mat, [relative_location.x, -relative_location.y, 1])
-        self.set_position(Position(a[0], a[1]))
+    def update(self, delta_time):
+        """
+        Our position is handled by the ship (see Ship._update_mounts)
+        """
+        if not self._ship:
+            return # Nothing to draw yet
 
-        s.center_x = int(self.position.x)
-        s.center_y = int(self.position.y)
+        if not self._on:
+            return # Hidden - nothing to animate
 
-        super().update(draw_event)
+        super().update(delta_time)
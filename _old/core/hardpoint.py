@@ -3,15 +3,11 @@ Class for handling hardpoints and weapons
 """
 
 import os
-import yaml
-import math
-import numpy
-import arcade
 
-from . import settings
-from .utils import _must_contain, emap, Position
-from .abstract import _AbstractDrawObject, TSprite
-from .projectile import Bullet
+from .protocache import read_info
+from .utils import _must_contain, emap, Position, frame_factor
+from .abstract import _AbstractDrawObject
+from .projectile import ProjectileEngine
 
 class Hardpoint(_AbstractDrawObject):
     """
@@ -31,6 +27,9 @@ class Hardpoint(_AbstractDrawObject):
     # -- Known - loaded hardpoint descriptors
     _hardpoint_prototypes = {}
 
+    # -- Prototype name -> the .si file it came from
+    _hardpoint_files = {}
+
     def __init__(self, hardpoint_info, ship_hardpoint_info, ship):
         super().__init__()
         self._name      = hardpoint_info['name']
@@ -39,6 +38,7 @@ class Hardpoint(_AbstractDrawObject):
         self._location  = hardpoint_info['ammo']
         self._damage    = hardpoint_info['damage']
         self._command   = hardpoint_info['rate']
+        self._rate      = hardpoint_info['rate']
         self._range     = hardpoint_info['range']
         self._props     = hardpoint_info.get('props', {})
         self._ship_hi   = ship_hardpoint_info
@@ -49,8 +49,6 @@ class Hardpoint(_AbstractDrawObject):
         self._on = False
         self._tick_delta = 0
 
-        self._children = set()
-
     def __repr__(self):
         return f"<(Hardpoint, {self._name})>"
 
@@ -58,6 +56,13 @@ class Hardpoint(_AbstractDrawObject):
     def new_hardpoint(cls, prototype: str, sinfo: dict, ship):
         return cls(cls._hardpoint_prototypes[prototype], sinfo, ship)
 
+    @classmethod
+    def prototype_file(cls, prototype: str) -> str:
+        """
+        :return: The .si file a prototype was loaded from (or None)
+        """
+        return cls._hardpoint_files.get(prototype)
+
     @property
     def name(self):
         return self._name
@@ -90,10 +95,22 @@ class Hardpoint(_AbstractDrawObject):
     def command(self):
         return self._command
 
+    @property
+    def rate(self):
+        """
+        :return: Frames (at FRAME_RATE) between shots while automatic
+        fire is on
+        """
+        return self._rate
+
     @property
     def angle(self):
         return self._ship.angle # This will change
 
+    @property
+    def ship(self):
+        return self._ship
+
     def fire(self):
         """
         If possible - use this item.
@@ -107,11 +124,20 @@ class Hardpoint(_AbstractDrawObject):
         if self._type == Hardpoint.BULLET:
             # A projectile with a b-line path
             if self._props.get('automatic', False):
-                self._on = True
-                self._tick_delta = 0
+                if not self._on:
+                    self._on = True
+                    self._tick_delta = 0
+                    self._fire()
             else:
                 self._fire()
 
+    def cease_fire(self):
+        """
+        Stop using an "on/off" item
+        """
+        self._on = False
+        self._tick_delta = 0
+
     def _fire(self):
         """
         Internal call that's used when we run an update (every n frames
@@ -121,39 +147,54 @@ class Hardpoint(_AbstractDrawObject):
 
             # TODO: Ammunition from inventory
 
-            bullet = Bullet(
+            ProjectileEngine().spawn(
                 self._props.get('sprite', 'basic_bullet'),
-                self._damage,
                 self.position,
+                self.angle,
                 self._range,
+                self._damage,
                 self
             )
-            bullet.add_to_scene()
-            self._children.add(bullet)
 
-    def remove_child(self, child):
+    @classmethod
+    def add_info_file(cls, info_file: str, info_dir: str, cache = None):
         """
-        Evict a child from our listing
+        Load multiple hardpoint descriptors from a file
+        :param info_file: The .si file
+        :param info_dir: The directory it lives in
+        :param cache: Optional PrototypeCache (or AssetArchive) to skip parsing
+        unchanged files
+        :return: None
         """
-        if child in self._children:
-            self._children.remove(child)
+        def _validate(info):
+            return cls.validate_info(info_file, info)
+
+        if cache is not None:
+            info = cache.fetch(info_file, _validate)
+        else:
+            if not os.path.isfile(info_file):
+                raise RuntimeError(
+                    f"Info for {info_file} does not exist!"
+                )
+            info = _validate(read_info(info_file))
+
+        for hp_info in info:
+            n = hp_info['name']
+            if n in cls._hardpoint_prototypes:
+                raise RuntimeError(f"Duplicate hardpoint name: {n}! Must be unique!")
+
+            cls._hardpoint_prototypes[n] = hp_info
+            cls._hardpoint_files[n] = info_file
 
     @classmethod
-    def add_info_file(cls, info_file: str, info_dir: str):
+    def validate_info(cls, info_file: str, info) -> list:
         """
-        Load multiple hardpoint descriptors from a file
+        Verify the contents of a hardpoint .si file
+        :param info_file: The .si file (for error reporting)
+        :param info: The parsed yaml of the file
+        :return: list[dict] of hardpoint descriptors
         """
         errors = []
-        if not os.path.isfile(info_file):
-            raise RuntimeError(
-                f"Info for {info_file} does not exist!"
-            )
-
-        try:
-            with open(info_file, 'r') as f:
-                info = yaml.safe_load(f)
-        except Exception as e:
-            raise RuntimeError(str(e))
 
         if not isinstance(info, list):
             raise RuntimeError(
@@ -184,10 +225,7 @@ class Hardpoint(_AbstractDrawObject):
                 print ("\n".join(errors))
                 raise RuntimeError("Could not start game")
 
-            if n in cls._hardpoint_prototypes:
-                raise RuntimeError(f"Duplicate hardpoint name: {n}! Must be unique!")
-
-            cls._hardpoint_prototypes[n] = hp_info
+        return info
 
     @classmethod
     def verify_ship_hardpoint(cls, info: dict, errors: list):
@@ -239,9 +277,41 @@ class Hardpoint(_AbstractDrawObject):
         """ For now do nothing """
         pass
 
+    def mount_offset(self, ship_center: Position, scale: (int, float)) -> tuple:
+        """
+        Our location relative to the center of the ship (unrotated). The
+        ship caches this and only asks again if the scale changes.
+        :param ship_center: Position of the center of the ship's sprite
+        :param scale: The global scale
+        :return: tuple(x, y)
+        """
+        relative_location = Position(self._ship_hi['location'])
+        relative_location.imul(scale).isub(ship_center)
+        return (relative_location.x, -relative_location.y)
+
+    def set_mount_position(self,
+                           x: (int, float),
+                           y: (int, float),
+                           angle: (int, float)):
+        """
+        Called by our ship once it has transformed all of it's mounts
+        """
+        self._position.set(x, y)
+
+    def draw_at(self,
+                x: (int, float),
+                y: (int, float),
+                angle: (int, float)):
+        """
+        We don't draw anything of our own (see paint()) so there's
+        nothing to place between steps
+        """
+        pass
+
     def update(self, delta_time):
         """
-        Update outselves and any children
+        Update outselves. Our position is handled by the ship
+        (see Ship._update_mounts)
         """
 
         if not self._ship:
@@ -250,39 +320,9 @@ class Hardpoint(_AbstractDrawObject):
         if self._on:
             # If we're "automatic" - check to seee if we need to fire this
             # item
-            pass
-
-        #
-        # Just like out engines - we have to place outselves relative
-        # to the craft
-        #
-        scale = settings.get_setting('global_scale', 1.0)
-
-        ship_sprite = self._ship.sprite()
-
-        this_location = Position(self._ship_hi['location']) * scale
-        ship_center = Position(
-            ship_sprite.width / 2,
-            ship_sprite.height / 2
-        )
-
-        relative_location = this_location - ship_center
-
-        rads = math.radians(self._ship.angle)
-        mat = numpy.array([
-            [math.cos(rads), -math.sin(rads), self._ship.position.x],
-            [math.sin(rads), math.cos(rads),  self._ship.position.y],
-            [0,              0,               1]
-        ])
-
-        a = numpy.matmul(mat, [relative_location.x, -relative_location.y, 1])
-        self.set_position(Position(a[0], a[1]))
+            self._tick_delta += frame_factor(delta_time)
+            if self._tick_delta >= self._rate:
+                self._tick_delta -= self._rate
+                self._fire()
 
         super().update(delta_time) # Update ourselves
-
-        # Update any "children"
-        staged_for_removal = set()
-        for child in self._children:
-            if not child.update(delta_time):
-                staged_for_removal.add(child)
-        emap(lambda x: self.remove_child(x), staged_for_removal)
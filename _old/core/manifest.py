@@ -0,0 +1,232 @@
+"""
+Index of the images within our data tree
+"""
+
+import os
+import re
+
+from .sheet import SpriteSheet, SHEET_EXT
+
+class _DirectoryEntry(object):
+    """
+    The (sorted) contents of a single directory
+    """
+    def __init__(self):
+        self.dirs = []
+        self.files = []
+
+
+class AssetManifest(object):
+    """
+    Singleton map of our data tree built once at load time.
+
+    Sprite construction asks us for the states and animation frames of an
+    entity rather than listing directories and matching file names on each
+    build. Directories outside of the scanned tree are indexed the first
+    time they're asked for.
+    """
+    ANIM_REGEX = re.compile(r"^(?P<name>.+)_(?P<frame>\d+)\.png$")
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_directories'):
+            # directory -> _DirectoryEntry
+            self._directories = {}
+
+        if not hasattr(self, '_states'):
+            # texture directory -> states (see states())
+            self._states = {}
+
+        if not hasattr(self, '_sheets'):
+            # sheet image path -> SpriteSheet
+            self._sheets = {}
+
+        if not hasattr(self, '_sheet_info'):
+            # .sheet file -> already validated descriptor (see scan())
+            self._sheet_info = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(os.path.abspath(path))
+
+    def scan(self, root: str, files: list = None, sheets: dict = None):
+        """
+        Index an entire tree
+        :param root: The directory to index
+        :param files: Optional list[str] of '/' separated paths relative to
+        root (e.g. AssetArchive.files) to build from rather than the disk
+        :param sheets: Optional dict of '/' separated .sheet path -> validated
+        descriptor (e.g. AssetArchive.sheets()) so we don't read them
+        :return: None
+        """
+        root = self._key(root)
+
+        for key, info in (sheets or {}).items():
+            self._sheet_info[os.path.join(root, *key.split('/'))] = info
+
+        if files is None:
+            files = []
+            for directory, dirs, filenames in os.walk(root):
+                relative = os.path.relpath(directory, root).replace(os.sep, '/')
+                for f in filenames:
+                    files.append(f if relative == '.' else f"{relative}/{f}")
+
+        self._directories.setdefault(root, _DirectoryEntry())
+        for key in files:
+            parts = key.split('/')
+            directory = root
+            for part in parts[:-1]:
+                entry = self._directories.setdefault(directory, _DirectoryEntry())
+                if part not in entry.dirs:
+                    entry.dirs.append(part)
+                directory = os.path.join(directory, part)
+
+            self._directories.setdefault(
+                directory, _DirectoryEntry()
+            ).files.append(parts[-1])
+
+        for entry in self._directories.values():
+            entry.dirs.sort()
+            entry.files.sort()
+
+        self._states.clear()
+        self._sheets.clear()
+
+    def _entry(self, directory: str) -> _DirectoryEntry:
+        """
+        :return: _DirectoryEntry for a directory, listing it now if it
+        wasn't part of a scan
+        """
+        key = self._key(directory)
+        if key not in self._directories:
+            entry = _DirectoryEntry()
+            if os.path.isdir(key):
+                for name in sorted(os.listdir(key)):
+                    if os.path.isdir(os.path.join(key, name)):
+                        entry.dirs.append(name)
+                    else:
+                        entry.files.append(name)
+            self._directories[key] = entry
+        return self._directories[key]
+
+    def images(self, directory: str) -> list:
+        """
+        :return: list[str] of every image within directory (recursive)
+        """
+        key = self._key(directory)
+        entry = self._entry(key)
+
+        images = [os.path.join(key, f) for f in entry.files if f.endswith('.png')]
+        for d in entry.dirs:
+            images.extend(self.images(os.path.join(key, d)))
+        return images
+
+    def sheet(self, image_path: str) -> SpriteSheet:
+        """
+        :return: The SpriteSheet of an image or None if it's not a sheet
+        """
+        key = self._key(image_path)
+        if key not in self._sheets:
+            directory, filename = os.path.split(key)
+            sheet_file = os.path.join(directory, filename[:-4] + SHEET_EXT)
+            if filename.endswith('.png') and \
+               os.path.basename(sheet_file) in self._entry(directory).files:
+                self._sheets[key] = SpriteSheet.from_file(
+                    sheet_file, self._sheet_info.get(sheet_file)
+                )
+            else:
+                self._sheets[key] = None
+        return self._sheets[key]
+
+    def slice_sheets(self, images: dict) -> dict:
+        """
+        Swap any decoded sheets for their individual frames
+        :param images: dict of path -> PIL.Image
+        :return: dict of path|frame path -> PIL.Image
+        """
+        sliced = {}
+        for path, image in images.items():
+            sheet = self.sheet(path)
+            if sheet is None:
+                sliced[path] = image
+            else:
+                sliced.update(zip(sheet.frame_paths(), sheet.slice(image)))
+        return sliced
+
+    def _animation(self, directory: str, name: str) -> list:
+        """
+        :return: list[str] of the ordered frames of an animation
+        """
+        frames = []
+        for filename in self._entry(directory).files:
+            match = AssetManifest.ANIM_REGEX.match(filename)
+            if match and match.group('name') == name:
+                frames.append((int(match.group('frame')), filename))
+
+        return [os.path.join(directory, f) for _, f in sorted(frames)]
+
+    def states(self, texture_dir: str) -> dict:
+        """
+        Each folder within texture_dir holds the states of an entity. A
+        state is either a single image, an animation of numbered frames
+        (name_001.png, name_002.png, ...) or a sprite sheet (name.png with
+        name.sheet)
+        :return: dict of "{folder}-{name}" -> str|list[str]
+        """
+        key = self._key(texture_dir)
+        if key in self._states:
+            return self._states[key]
+
+        states = {}
+        for folder in self._entry(key).dirs:
+            this_dirname = os.path.join(key, folder)
+
+            for texture in self._entry(this_dirname).files:
+                if not texture.endswith('.png'):
+                    continue
+
+                sheet = self.sheet(os.path.join(this_dirname, texture))
+                if sheet is not None:
+                    states[f"{folder}-{texture[:-4]}"] = sheet.frame_paths()
+                    continue
+
+                anim_match = AssetManifest.ANIM_REGEX.match(texture)
+                if anim_match:
+                    name = anim_match.group('name')
+                    state_name = f"{folder}-{name}"
+                    if state_name not in states:
+                        states[state_name] = self._animation(this_dirname, name)
+                else:
+                    states[f"{folder}-{texture[:-4]}"] = os.path.join(
+                        this_dirname, texture
+                    )
+
+        self._states[key] = states
+        return states
+
+    def frames(self, texture_dir: str, name: str) -> list:
+        """
+        A basic texture is either texture_dir/name.png, a sprite sheet
+        (texture_dir/name.png with texture_dir/name.sheet) or a directory
+        of numbered frames, texture_dir/name/name_001.png, ...
+        :return: list[str] of image (or sheet frame) paths
+        """
+        key = self._key(texture_dir)
+        entry = self._entry(key)
+
+        if f"{name}.png" in entry.files:
+            image_path = os.path.join(key, f"{name}.png")
+            sheet = self.sheet(image_path)
+            if sheet is not None:
+                return sheet.frame_paths()
+            return [image_path]
+
+        if name in entry.dirs:
+            return self._animation(os.path.join(key, name), name)
+
+        return []
@@ -31,16 +31,16 @@ class Player(TObject):
     def update(self, delta_time):
         """
         Update the players game state
+        :note: The ship itself is stepped by the Simulation
         """
-        if self._ship:
-            self.ship.update(delta_time)
+        pass
 
     def set_ship(self, ship: Ship):
         """
         Set the players active ship
         """
         if self._ship:
-            self._ship.stop_listening(self.ship_took_damage)
+            self._ship.take_damage.stop_listening(self.ship_took_damage)
 
         self._ship = ship
         self._ship.take_damage.listen_post(
@@ -133,6 +133,8 @@ class Player(TObject):
             self.ship.set_angle_delta(self.ship.angle_delta - 3)
         elif key == arcade.key.D:
             self.ship.set_angle_delta(self.ship.angle_delta + 3)
+        elif key == arcade.key.SPACE:
+            self.ship.cease_command('fire1')
         else:
             consumed = False
 
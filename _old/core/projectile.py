@@ -4,77 +4,412 @@ Tools for the firing of things!
 
 import os
 import math
+import numpy
+import weakref
+import itertools
 import arcade
 
 from . import settings
 from .abstract import _AbstractDrawObject
-from .utils import Position
+from .utils import Position, frame_factor
+from .textures import TextureCache
 
-class Bullet(_AbstractDrawObject):
+
+class _ProjectileBatch(object):
     """
-    Shoot to kill!
+    Every live projectile that shares a single sprite image.
+
+    Rather than an object per bullet, we store each property in it's own
+    contiguous array (structure of arrays) so the whole batch can be moved
+    in one vectorized step. Live projectiles are always packed into the
+    first `count` slots.
     """
+    GROWTH = 256
+
+    # Names of each per-projectile array
+    ARRAYS = (
+        'position', 'previous', 'velocity', 'speed', 'traveled',
+        'range', 'damage', 'angle', 'owner'
+    )
+
+    def __init__(self, texture: arcade.Texture, scale: (int, float)):
+        self._texture = texture
+        self._scale = scale
+
+        self._count = 0
+        self._capacity = 0
+
+        self.position = numpy.zeros((0, 2))
+        self.previous = numpy.zeros((0, 2)) # As of the last step
+        self.velocity = numpy.zeros((0, 2))
+        self.speed    = numpy.zeros(0)
+        self.traveled = numpy.zeros(0)
+        self.range    = numpy.zeros(0)
+        self.damage   = numpy.zeros(0)
+        self.angle    = numpy.zeros(0)
+        self.owner    = numpy.zeros(0, dtype=numpy.int64)
+
+        #
+        # A pool of sprites that's only ever grown. Slots beyond the
+        # live count are hidden rather than removed.
+        #
+        self._sprites = arcade.SpriteList(use_spatial_hash=False)
+        self._pool = []
+        self._visible = 0
+
+        # The buffer slot of each pooled sprite (see _slot_indices())
+        self._slots = None
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def texture(self):
+        return self._texture
 
-    # Location to find bullet images
-    _data_directory = ""
+    def _grow(self):
+        """
+        Double our capacity (and the sprite pool to match)
+        """
+        capacity = max(self._capacity * 2, _ProjectileBatch.GROWTH)
+        for name in _ProjectileBatch.ARRAYS:
+            current = getattr(self, name)
+            grown = numpy.zeros(
+                (capacity,) + current.shape[1:], dtype=current.dtype
+            )
+            grown[:self._count] = current[:self._count]
+            setattr(self, name, grown)
+
+        for i in range(self._capacity, capacity):
+            sprite = arcade.Sprite(scale=self._scale)
+            sprite.texture = self._texture
+            sprite.alpha = 0
+            self._sprites.append(sprite)
+            self._pool.append(sprite)
 
-    def __init__(self,
-                 name: str,
-                 damage: (int, float),
-                 origin: Position,
-                 range_: (int, float),
-                 owner: _AbstractDrawObject):
+        # New sprites shift the buffer (see _slot_indices())
+        self._slots = None
+        self._capacity = capacity
+
+    def spawn(self,
+              origin: Position,
+              angle: (int, float),
+              speed: (int, float),
+              range_: (int, float),
+              damage: (int, float),
+              owner_id: int):
         """
-        Construct a bullet!
+        Place a new projectile in the next free slot
         """
+        if self._count == self._capacity:
+            self._grow()
+
+        i = self._count
+        radians = math.radians(angle)
+
+        self.position[i] = (origin.x, origin.y)
+        self.previous[i] = self.position[i]
+        self.velocity[i] = (-math.sin(radians) * speed, math.cos(radians) * speed)
+        self.speed[i]    = speed
+        self.traveled[i] = 0
+        self.range[i]    = range_
+        self.damage[i]   = damage
+        self.angle[i]    = angle
+        self.owner[i]    = owner_id
+
+        self._count += 1
+
+    def step(self, factor: (int, float) = 1.0):
+        """
+        Move every live projectile and drop the ones that have
+        gone passed their range
+        :param factor: Number of frames to move (see frame_factor())
+        """
+        n = self._count
+        if not n:
+            return
+
+        self.previous[:n] = self.position[:n]
+        self.traveled[:n] += self.speed[:n] * factor
+        self.position[:n] += self.velocity[:n] * factor
+        self.retain(self.traveled[:n] <= self.range[:n])
+
+    def kill(self, indices):
+        """
+        Remove the projectiles at the given slots
+        :param indices: array of slot indices
+        :return: None
+        """
+        mask = numpy.ones(self._count, dtype=bool)
+        mask[indices] = False
+        self.retain(mask)
+
+    def retain(self, mask):
+        """
+        Keep only the projectiles where mask is True, packing them
+        back into the front of our arrays
+        :param mask: numpy.ndarray[bool] the length of our live count
+        :return: None
+        """
+        keep = numpy.flatnonzero(mask)
+        if len(keep) == self._count:
+            return
+
+        n = self._count
+        for name in _ProjectileBatch.ARRAYS:
+            array = getattr(self, name)
+            array[:len(keep)] = array[:n][keep]
+        self._count = len(keep)
+
+    def _slot_indices(self):
+        """
+        :return: The buffer index of each pooled sprite (cached until
+        the pool next grows)
+        """
+        if self._slots is None:
+            sprite_idx = self._sprites.sprite_idx
+            self._slots = numpy.array(
+                [sprite_idx[sprite] for sprite in self._pool],
+                dtype=numpy.int64
+            )
+        return self._slots
+
+    def _buffers_ready(self) -> bool:
+        """
+        :return: True if our SpriteList has built it's flat sprite
+        arrays. Appending a sprite throws them away (they're rebuilt
+        from each sprite's attributes on the next draw).
+        """
+        return getattr(self._sprites, '_vao1', None) is not None
+
+    def _buffers(self) -> tuple:
+        """
+        numpy views onto the position, angle and color data of our
+        SpriteList. These must not outlive the call that asked for them
+        (the SpriteList can't grow while they're held).
+        :return: tuple(positions, angles, colors)
+        """
+        sprites = self._sprites
+        return (
+            numpy.frombuffer(
+                sprites._sprite_pos_data, dtype=numpy.float32
+            ).reshape(-1, 2),
+            numpy.frombuffer(sprites._sprite_angle_data, dtype=numpy.float32),
+            numpy.frombuffer(
+                sprites._sprite_color_data, dtype=numpy.uint8
+            ).reshape(-1, 4),
+        )
+
+    def write(self, alpha: float = 1.0):
+        """
+        Put our live projectiles into the SpriteList ready for drawing
+        :param alpha: How far between the previous and current step
+        to draw each projectile (0.0 - 1.0)
+        """
+        n = self._count
+
+        if alpha >= 1.0:
+            positions = self.position[:n]
+        else:
+            previous = self.previous[:n]
+            positions = previous + (self.position[:n] - previous) * alpha
+
+        if self._buffers_ready():
+            self._write_buffers(n, positions)
+        else:
+            self._write_sprites(n, positions)
+        self._visible = n
+
+    def paint(self, alpha: float = 1.0):
+        """
+        Write our positions into the sprite buffer and draw the
+        batch in a single call
+        :param alpha: See write()
+        """
+        self.write(alpha)
+        self._sprites.draw()
+
+    def _write_buffers(self, n: int, positions):
+        """
+        Vectorized write of the live projectiles straight into the
+        SpriteList's data. Only the slots that changed liveliness have
+        their alpha touched.
+        """
+        sprites = self._sprites
+        buffer_positions, buffer_angles, buffer_colors = self._buffers()
+        slots = self._slot_indices()
+
+        live = slots[:n]
+        buffer_positions[live] = positions
+        buffer_angles[live] = numpy.radians(self.angle[:n])
+
+        buffer_colors[slots[n:self._visible], 3] = 0
+        buffer_colors[slots[self._visible:n], 3] = 255
+
+        sprites._sprite_pos_changed = True
+        sprites._sprite_angle_changed = True
+        sprites._sprite_color_changed = True
+
+    def _write_sprites(self, n: int, positions):
+        """
+        One sprite at a time, for when the SpriteList is about to
+        rebuild it's buffers from the sprites themselves. Every sprite
+        has it's alpha set as the rebuild won't know what we hid.
+        """
+        for sprite in self._pool[:n]:
+            sprite.alpha = 255
+        for sprite in self._pool[n:]:
+            sprite.alpha = 0
+
+        angles = self.angle[:n].tolist()
+        for sprite, (x, y), angle in zip(self._pool, positions.tolist(), angles):
+            sprite.center_x = x
+            sprite.center_y = y
+            sprite.angle = angle
+
+
+class ProjectileEngine(_AbstractDrawObject):
+    """
+    Shoot to kill!
+
+    Singleton that owns every live projectile in the game. Hardpoints
+    spawn() into it and the whole lot moves in one update() per frame.
+    """
+
+    # How far a projectile moves each frame (at FRAME_RATE)
+    SPEED = 13
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, '_batches'):
+            return
+
         super().__init__()
-        self._name = name
-        self._damage = damage
-        self._origin = origin
-        self._range = range_
-        self._owner = owner
+        self.set_z_depth(-1) # To render under ships
+
+        # Location to find bullet images
+        self._data_directory = ""
+
+        # sprite name -> _ProjectileBatch
+        self._batches = {}
+
+        #
+        # Owners are stored by id within the batches. We only hold them
+        # weakly so a destroyed ship (and it's hardpoints) can be freed
+        # while it's projectiles are still in flight. Ids are never
+        # reused so those projectiles can't be credited to a newcomer.
+        #
+        self._owners = weakref.WeakValueDictionary()
+        self._owner_ids = weakref.WeakKeyDictionary()
+        self._next_owner_id = itertools.count()
+
+        # Where we draw between the last two steps (see interpolate())
+        self._alpha = 1.0
 
-        self.set_z_depth(self._owner.z_depth - 1)
-        self._speed = 13
-        self._traveled = 0
+    @property
+    def batches(self):
+        return self._batches
 
-    @classmethod
-    def set_data_directory(cls, data_directory: str):
+    def set_data_directory(self, data_directory: str):
         """
-        Set the classwide data directory
+        Set the location of our bullet images
         """
-        cls._data_directory = data_directory
+        self._data_directory = data_directory
+
+    def owner(self, owner_id: int):
+        """
+        :return: The object that fired the projectile with this owner id
+        or None if it's since been thrown away
+        """
+        return self._owners.get(owner_id)
+
+    def _owner_id(self, owner) -> int:
+        owner_id = self._owner_ids.get(owner)
+        if owner_id is None:
+            owner_id = next(self._next_owner_id)
+            self._owner_ids[owner] = owner_id
+            self._owners[owner_id] = owner
+        return owner_id
+
+    def _batch(self, name: str) -> _ProjectileBatch:
+        """
+        :return: The _ProjectileBatch for a given sprite (created if needed)
+        """
+        if name not in self._batches:
+            scale = settings.get_setting('global_scale', 1.0)
+            texture = TextureCache().acquire(
+                os.path.join(self._data_directory, name + '.png'),
+                scale=scale
+            )
+            self._batches[name] = _ProjectileBatch(texture, scale)
+        return self._batches[name]
+
+    def spawn(self,
+              name: str,
+              origin: Position,
+              angle: (int, float),
+              range_: (int, float),
+              damage: (int, float),
+              owner: _AbstractDrawObject,
+              speed: (int, float) = None):
+        """
+        Fire a single projectile
+        :param name: The sprite to use for this projectile
+        :param origin: Position to fire from
+        :param angle: The direction (in degrees) of travel
+        :param range_: How far we can go before we die
+        :param damage: The damage this deals on contact
+        :param owner: The object that fired this projectile
+        :param speed: Override to the default SPEED
+        :return: None
+        """
+        if not self.is_in_scene:
+            self.add_to_scene()
+
+        self._batch(name).spawn(
+            origin,
+            angle,
+            ProjectileEngine.SPEED if speed is None else speed,
+            range_,
+            damage,
+            self._owner_id(owner)
+        )
+
+    def clear(self):
+        """
+        Drop every live projectile (and the batches holding them)
+        """
+        for batch in self._batches.values():
+            TextureCache().release(batch.texture)
+        self._batches.clear()
 
     def draw_method(self):
         """
-        Bullets are a simple sprite
+        We push our batches to the screen ourselves
         """
-        return _AbstractDrawObject.SPRITE_BASED
+        return _AbstractDrawObject.PAINT_BASED
 
-    def load_sprite(self):
+    def interpolate(self, alpha: float):
         """
-        Get the bullet sprite
+        Draw projectiles between their previous and current step
+        :param alpha: 0.0 (previous step) to 1.0 (current step)
         """
-        s = self.load_basic(Bullet._data_directory, self._name)        
-        s.set_position(self._origin)
-        s.angle = self._owner.angle
+        self._alpha = alpha
 
-        radians = math.radians(self._owner.angle)
-        s.change_y = math.cos(radians) * self._speed
-        s.change_x = -math.sin(radians) * self._speed
-        return s
+    def paint(self, draw_event):
+        for batch in self._batches.values():
+            batch.paint(self._alpha)
 
     def update(self, delta_time):
         """
-        We have to move the bullet along based on the velocity
-        :return: bool - False if this item is being staged for deletion
+        Move every projectile we own along it's path
         """
-        self._traveled += self._speed
-        if self._traveled > self._range:
-            # We've gone passed our range - time to die
-            self.remove_from_scene()
-            self.sprite().kill() # Just in case
-            return False
-
-        super().update(delta_time)
-        return True
+        factor = frame_factor(delta_time)
+        for batch in self._batches.values():
+            batch.step(factor)
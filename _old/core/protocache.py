@@ -0,0 +1,201 @@
+"""
+Compiled cache for our .si prototype definitions
+"""
+
+import os
+import yaml
+import pickle
+import hashlib
+
+# Use the C loader when pyyaml was built with it
+_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+def parse_info(text: str):
+    """
+    :return: The parsed yaml of a .si file
+    """
+    try:
+        return yaml.load(text, Loader=_LOADER)
+    except Exception as e:
+        raise RuntimeError(str(e))
+
+def read_info(info_file: str):
+    """
+    :return: The parsed yaml of a .si file on disk
+    """
+    with open(info_file, 'r') as f:
+        return parse_info(f.read())
+
+def _read_source(source: str) -> tuple:
+    """
+    Read, hash and parse a source file. Safe to run on a worker thread.
+    :return: tuple(digest, info)
+    """
+    with open(source, 'rb') as f:
+        raw = f.read()
+    return hashlib.sha1(raw).hexdigest(), parse_info(raw.decode('utf-8'))
+
+class PrototypeCache(object):
+    """
+    Parsing and validating every .si file with yaml at each boot adds up.
+    This keeps the validated result of each file in a single binary file
+    keyed by source path, modification time, and content hash.
+
+    Validation can also look past the file itself (e.g. a ship checks its
+    default hardpoint is known and that its sprites exist). Each entry
+    records what it saw of those dependencies: the content hash of any
+    other prototype file, or simply whether an asset exists. The entry
+    is only used while every dependency still looks the same.
+
+    Unchanged files load straight from the cache and only edited files
+    (or those whose dependencies changed) are parsed and validated again.
+    """
+
+    # Bump when the shape of any validated prototype changes
+    VERSION = 2
+
+    def __init__(self, cache_file: str):
+        self._cache_file = cache_file
+
+        # source path -> (mtime_ns, size, digest, data, dependencies)
+        # where dependencies is tuple((path, stamp),)
+        self._entries = {}
+        self._dirty = False
+
+        # Sources fetch()ed since we were loaded. Only their digests
+        # are trusted as dependency stamps
+        self._fetched = set()
+
+        # source path -> Future of _read_source() from prefetch()
+        self._pending = {}
+
+        self._load()
+
+    @property
+    def cache_file(self):
+        return self._cache_file
+
+    def _load(self):
+        """
+        Read in the cache (if we have a valid one)
+        """
+        if not os.path.isfile(self._cache_file):
+            return
+
+        try:
+            with open(self._cache_file, 'rb') as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return # Corrupt or unreadable - we'll just rebuild
+
+        if version == PrototypeCache.VERSION:
+            self._entries = entries
+
+    def is_fresh(self, source: str) -> bool:
+        """
+        :return: True if the cached data for source is up to date. This
+        only looks at the file itself - dependencies are checked by fetch()
+        """
+        entry = self._entries.get(source)
+        if not entry:
+            return False
+
+        stat = os.stat(source)
+        return entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+
+    def _stamp(self, path: str):
+        """
+        :return: What validation can see of a dependency. The digest of a
+        prototype file we've fetched, otherwise if it exists at all
+        """
+        if path in self._fetched:
+            return self._entries[path][2]
+        return os.path.exists(path)
+
+    def _dependencies_fresh(self, dependencies: tuple) -> bool:
+        return all(self._stamp(path) == stamp for path, stamp in dependencies)
+
+    def prefetch(self, sources: list, pool):
+        """
+        Read and parse any stale sources on a worker pool so fetch() only
+        has to validate them.
+        :param sources: list[str] of .si files
+        :param pool: concurrent.futures.Executor
+        :return: None
+        """
+        for source in sources:
+            if source not in self._pending and not self.is_fresh(source):
+                self._pending[source] = pool.submit(_read_source, source)
+
+    def fetch(self, source: str, validate, depends = None):
+        """
+        Get the validated data for a source file
+        :param source: The .si file
+        :param validate: callable(info) -> data that verifies the parsed
+        yaml of the file (only called when needed)
+        :param depends: callable(data) -> list[str] of any other files
+        validate() looked at. Prototype files must be fetch()ed before
+        anything that depends on them
+        :return: The validated data
+        """
+        if not os.path.isfile(source):
+            raise RuntimeError(f"Info for {source} does not exist!")
+
+        stat = os.stat(source)
+        entry = self._entries.get(source)
+
+        if entry and entry[0] == stat.st_mtime_ns and \
+           entry[1] == stat.st_size and self._dependencies_fresh(entry[4]):
+            self._fetched.add(source)
+            return entry[3]
+
+        if source in self._pending:
+            digest, info = self._pending.pop(source).result()
+        else:
+            digest, info = _read_source(source)
+
+        if entry and entry[2] == digest and self._dependencies_fresh(entry[4]):
+            # Touched but not changed
+            data = entry[3]
+            dependencies = entry[4]
+        else:
+            data = validate(info)
+            dependencies = tuple(
+                (path, self._stamp(path))
+                for path in (depends(data) if depends else ())
+            )
+
+        self._entries[source] = (
+            stat.st_mtime_ns, stat.st_size, digest, data, dependencies
+        )
+        self._fetched.add(source)
+        self._dirty = True
+        return data
+
+    def data(self, source: str):
+        """
+        :return: The validated data we hold for source (or None)
+        """
+        entry = self._entries.get(source)
+        return entry[3] if entry else None
+
+    def save(self):
+        """
+        Write the cache back out if anything has changed
+        """
+        if not self._dirty:
+            return
+
+        directory = os.path.dirname(self._cache_file)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        temp = self._cache_file + '.tmp'
+        with open(temp, 'wb') as f:
+            pickle.dump(
+                (PrototypeCache.VERSION, self._entries),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp, self._cache_file)
+        self._dirty = False
@@ -4,9 +4,207 @@ Render tools and tech for the game
 
 import arcade
 
+from . import settings
 from .abstract import _AbstractDrawObject
+from .camera import Camera
+from .spatial import SpatialHash
 from .utils import emap
 
+class _RenderLayer(object):
+    """
+    Everything the render engine draws at a single z-depth
+    """
+    def __init__(self):
+        # Only the sprites that are (close to) on screen. See cull()
+        self.sprites = arcade.SpriteList()
+
+        #
+        # Every sprite based object within the layer is indexed by
+        # it's bounds. Only objects that report they've moved are
+        # re-indexed
+        #
+        self.index = SpatialHash(settings.get_setting('render_cell_size', 256))
+        self._moved = set()
+
+        # Objects whose sprites are within self.sprites
+        self._visible = set()
+
+        # Objects without bounds - always drawn
+        self._unbounded = set()
+
+        #
+        # Dictionaries rather than lists. They keep the insertion order
+        # for drawing but let us drop an object in constant time
+        #
+        self.functional = {}
+        self.shape_based = {}
+
+        # Retained shapes for the shape based objects. These are only
+        # rebuilt when an object within the layer reports a change
+        self._shapes = None
+
+        #
+        # Removing from a SpriteList is O(n) so we queue up any
+        # departing sprites and compact the list once per frame
+        #
+        self._pending_removal = set()
+
+    def add_object(self, obj: _AbstractDrawObject):
+        """
+        Add a sprite based object. It's sprite is drawn once it's
+        within the view (see cull())
+        """
+        bounds = obj.bounds()
+        if bounds is None:
+            self._unbounded.add(obj)
+            self.add_sprite(obj._retrieve_sprite_pvt())
+        else:
+            self.index.insert(obj, bounds)
+
+    def remove_object(self, obj: _AbstractDrawObject):
+        self.index.remove(obj)
+        self._moved.discard(obj)
+        if obj in self._visible or obj in self._unbounded:
+            self._visible.discard(obj)
+            self._unbounded.discard(obj)
+            self.remove_sprite(obj._retrieve_sprite_pvt())
+
+    def moved(self, obj: _AbstractDrawObject):
+        """
+        Re-index an object on the next cull()
+        """
+        if obj in self.index:
+            self._moved.add(obj)
+
+    def cull(self, view):
+        """
+        Bring our sprite list in line with what's in view. Only the
+        objects entering or leaving the view are touched.
+        :param view: Rect of the world we're drawing
+        :return: None
+        """
+        for obj in self._moved:
+            self.index.move(obj, obj.bounds())
+        self._moved.clear()
+
+        visible = self.index.query(view)
+        for obj in self._visible - visible:
+            self.remove_sprite(obj._retrieve_sprite_pvt())
+        for obj in visible - self._visible:
+            self.add_sprite(obj._retrieve_sprite_pvt())
+        self._visible = visible
+
+    def add_sprite(self, sprite: arcade.Sprite):
+        """
+        Add a sprite to this layer. If the sprite is waiting to be
+        removed, we simply cancel that instead.
+        """
+        if sprite in self._pending_removal:
+            self._pending_removal.discard(sprite)
+        else:
+            self.sprites.append(sprite)
+
+    def remove_sprite(self, sprite: arcade.Sprite):
+        """
+        Stage a sprite for removal on the next compact()
+        """
+        self._pending_removal.add(sprite)
+
+    def compact(self):
+        """
+        Evict all sprites staged for removal in one pass.
+        :return: None
+        """
+        if not self._pending_removal:
+            return
+
+        old = self.sprites
+        self.sprites = arcade.SpriteList()
+        for sprite in old:
+            # Make sure the sprite forgets about the list we're dropping
+            sprite.sprite_lists.remove(old)
+            if sprite not in self._pending_removal:
+                self.sprites.append(sprite)
+
+        self._pending_removal.clear()
+
+    def invalidate_shapes(self):
+        """
+        Flag the shape cache for a rebuild on the next draw
+        """
+        self._shapes = None
+
+    def draw_shapes(self, draw_event):
+        """
+        Draw all shape based objects in one punch, rebuilding the
+        cache only when required
+        :param draw_event: The DrawEvent object that we pass along
+        :return: None
+        """
+        if not self.shape_based:
+            return
+
+        if self._shapes is None:
+            self._shapes = arcade.ShapeElementList()
+            for obj in self.shape_based:
+                if obj.visible:
+                    emap(self._shapes.append, obj.shapes(draw_event))
+                obj.set_dirty(False)
+
+        self._shapes.draw()
+
+
+class _WidgetLayer(object):
+    """
+    Every top level widget at a single z-depth.
+
+    Each widget retains a ShapeElementList and SpriteList of it's own
+    objects (see TWidget.rebuild) and only dirty widgets regenerate
+    theirs. The layer draws them in tree order without assembling
+    anything of it's own.
+    """
+    def __init__(self):
+        self.widgets = []
+
+    def add_widget(self, widget):
+        self.widgets.append(widget)
+
+    def remove_widget(self, widget):
+        if widget in self.widgets:
+            self.widgets.remove(widget)
+
+    def _walk(self, widgets: list):
+        """
+        Each widget followed by it's children
+        """
+        for widget in widgets:
+            yield widget
+            yield from self._walk(widget.children)
+
+    def draw(self, draw_event):
+        """
+        Draw every shape of the layer, then every sprite, and then let
+        the widgets paint
+        :param draw_event: The DrawEvent object that we pass along
+        :return: None
+        """
+        shown = [w for w in self._walk(self.widgets) if w.visible]
+
+        for widget in shown:
+            if widget.dirty:
+                widget.rebuild(draw_event)
+
+        for widget in shown:
+            widget.shape_list.draw()
+
+        for widget in shown:
+            if widget.sprite_list:
+                widget.sprite_list.draw()
+
+        for widget in shown:
+            widget.paint(draw_event)
+
+
 class RenderEngine(object):
     """
     The main render toolkit (really it's just a wrapper around the
@@ -32,12 +230,16 @@ class RenderEngine(object):
         if not hasattr(self, '_widget_layers'):
             self._widget_layers = {}
 
-        if not hasattr(self, '_cached_shapes'):
-            self._cached_shapes = {}
-
         if not hasattr(self, '_data_directory'):
             self._data_directory = {}
 
+        if not hasattr(self, '_camera'):
+            self._camera = Camera(*settings.get_setting('resolution', (1200, 800)))
+
+    @property
+    def camera(self) -> Camera:
+        return self._camera
+
     def data_directory(self):
         return self._data_directory
 
@@ -49,32 +251,28 @@ class RenderEngine(object):
         Add an object to either our sprite setup or our
         manual render process.
         """
+        layer = self._layer(obj.z_depth)
+
         if obj.draw_method() & _AbstractDrawObject.SPRITE_BASED:
             #
             # This object is sprite based - we'll add it to our sprite
             # load for that depth. This way we can draw them in batches
             #
-            sprite = obj._retrieve_sprite_pvt()
-            self._render_layers.setdefault(
-                obj.z_depth, [arcade.SpriteList(), [], []]
-            )[0].append(sprite)
+            layer.add_object(obj)
 
         if obj.draw_method() & _AbstractDrawObject.SHAPE_BASED:
             #
             # We have a function to return a list of shapes for use to draw
             #
-            self._render_layers.setdefault(
-                obj.z_depth, [arcade.SpriteList(), [], []]
-            )[2].append(obj)
+            layer.shape_based[obj] = None
+            layer.invalidate_shapes()
 
         elif obj.draw_method() & _AbstractDrawObject.PAINT_BASED:
             #
             # This object uses the paint() function to paint out it's
             # environment.
             #
-            self._render_layers.setdefault(
-                obj.z_depth, [arcade.SpriteList(), [], []]
-            )[1].append(obj)
+            layer.functional[obj] = None
         obj.set_in_scene(True)
 
     def unload_object(self, obj: _AbstractDrawObject):
@@ -82,34 +280,61 @@ class RenderEngine(object):
         Unload an object from our setup
         """
         if obj.z_depth in self._render_layers:
+            layer = self._render_layers[obj.z_depth]
             if obj.draw_method() & _AbstractDrawObject.SPRITE_BASED:
-                self._render_layers[obj.z_depth][0].remove(
-                    obj._retrieve_sprite_pvt()
-                )
+                layer.remove_object(obj)
 
             if obj.draw_method() & _AbstractDrawObject.SHAPE_BASED:
-                self._render_layers[obj.z_depth][2].remove(obj)
+                layer.shape_based.pop(obj, None)
+                layer.invalidate_shapes()
 
-            if obj.draw_method() & _AbstractDrawObject.PAINT_BASED:
-                self._render_layers[obj.z_depth][1].remove(obj)
+            elif obj.draw_method() & _AbstractDrawObject.PAINT_BASED:
+                layer.functional.pop(obj, None)
         obj.set_in_scene(False)
 
+    def moved(self, obj: _AbstractDrawObject):
+        """
+        Called by sprite based objects in the scene when their bounds
+        have changed so we can keep our culling index up to date
+        """
+        if obj.z_depth in self._render_layers:
+            self._render_layers[obj.z_depth].moved(obj)
+
+    def invalidate_shapes(self, z_depth: int):
+        """
+        Called by shape based objects when their shapes have changed
+        :param z_depth: The depth of the layer to rebuild
+        :return: None
+        """
+        if z_depth in self._render_layers:
+            self._render_layers[z_depth].invalidate_shapes()
+
+
+    def _layer(self, z_depth: int) -> _RenderLayer:
+        """
+        :return: The _RenderLayer at the given depth (created if needed)
+        """
+        if z_depth not in self._render_layers:
+            self._render_layers[z_depth] = _RenderLayer()
+        return self._render_layers[z_depth]
 
     def add_widget(self, widget):
         """
         Add a widget to the top of the render layers (children will be handled
         by parent widgets)
         """
-        self._widget_layers.setdefault(widget.z_depth, []).append(widget)
+        if widget.z_depth not in self._widget_layers:
+            self._widget_layers[widget.z_depth] = _WidgetLayer()
+        self._widget_layers[widget.z_depth].add_widget(widget)
 
     def remove_widget(self, widget):
         """
         Remove a top level widget. This is often used when we set a parent 
         on a widget
         """
-        layer = self._widget_layers.get(widget.z_depth, [])
-        if widget in layer:
-            layer.remove(widget)
+        layer = self._widget_layers.get(widget.z_depth)
+        if layer is not None:
+            layer.remove_widget(widget)
 
     def render(self, draw_event):
         """
@@ -118,70 +343,41 @@ class RenderEngine(object):
 
         #
         # Render the game objects - Trying to render bulk where
-        # possible.
+        # possible. Only what the camera can see (plus a margin) is
+        # submitted.
         #
+        self._camera.apply()
+        view = self._camera.view(settings.get_setting('render_margin', 64))
+
         for i in sorted(self._render_layers.keys()):
-            sprite_list, functional_draw, shape_based = self._render_layers[i]
+            layer = self._render_layers[i]
+            layer.cull(view)
 
+            # Anything unloaded or out of view since the last frame is
+            # evicted here
+            layer.compact()
 
             # We draw sprites items first
-            sprite_list.draw()
+            layer.sprites.draw()
 
             # The we draw the functional list
-            for f in functional_draw:
-                f.paint(draw_event)
+            for f in layer.functional:
+                if not f.visible:
+                    continue
+
+                bounds = f.bounds()
+                if bounds is None or bounds.intersects(view):
+                    f.paint(draw_event)
 
-            # TODO: (needs cache) We'll do our shapes last - in one punch
-            # shapes = arcade.ShapeElementList()
-            # for sb in shape_based:
-                # emap(lambda x: shapes.append, sb.shapes(draw_event))
-            # shapes.draw()
+            # We'll do our shapes last - in one punch
+            layer.draw_shapes(draw_event)
 
         #
         # The interface and other widgets render on top. This might
         # change one day but for now - we'll just ride with this
         #
+        self._camera.apply_screen()
 
         for i in sorted(self._widget_layers.keys()):
-
-            widgets = self._widget_layers[i]
-            whash = tuple(widgets)
-
-            if whash in self._cached_shapes:
-
-                shapes = self._cached_shapes[whash][0]
-                sprites = self._cached_shapes[whash][1]
-                if any(w.dirty for w in widgets):
-
-                    #
-                    # Recalculate the shapes and sprites within
-                    # the widgets.
-                    #
-
-                    for s in shapes[:]:
-                        shapes.remove(s)
-
-                    for s in sprites[:]:
-                        sprites.remove(s)
-
-                    for widget in widgets:
-                        emap(shapes.append, widget.shapes(draw_event))
-                        emap(sprites.append, widget.sprites(draw_event))
-                        widget.set_dirty(False)
-
-            else:
-                shapes, sprites = self._cached_shapes.setdefault(
-                    whash, [arcade.ShapeElementList(), arcade.SpriteList()]
-                )
-
-                for widget in widgets:
-                    emap(shapes.append, widget.shapes(draw_event))
-                    emap(sprites.append, widget.sprites(draw_event))
-                    widget.set_dirty(False)
-
-            shapes.draw()
-            sprites.draw()
-
-            # Finally, we paint!
-            for widget in widgets:
-                widget.paint(draw_event)
+            # Each widget only rebuilds it's geometry when it's dirty
+            self._widget_layers[i].draw(draw_event)
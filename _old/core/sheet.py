@@ -0,0 +1,140 @@
+"""
+Sprite sheet animations
+
+A sheet is a single image holding every frame of an animation on a grid
+with a descriptor of the same name next to it:
+
+    # fire_bloom_w.sheet
+    frame_width: 8
+    frame_height: 12
+    frames: 5
+    columns: 5   # Optional - as many as fit across the image
+
+Frames run left to right, top to bottom. Each frame is known by a frame
+path ("{image}#{index}") so it can be staged and cached like any other
+image while the sheet itself is only decoded once.
+"""
+
+import PIL.Image
+
+from .utils import _must_contain, emap
+from .protocache import read_info
+
+SHEET_EXT = '.sheet'
+
+_FRAME_SEPARATOR = '#'
+
+def frame_path(image_path: str, index: int) -> str:
+    """
+    :return: The path we know a single frame of a sheet by
+    """
+    return f"{image_path}{_FRAME_SEPARATOR}{index:03d}"
+
+def split_frame_path(path: str) -> tuple:
+    """
+    :return: tuple(image path, frame index) or (path, None) if path
+    isn't a frame of a sheet
+    """
+    image_path, sep, index = path.rpartition(_FRAME_SEPARATOR)
+    if not sep or not index.isdigit():
+        return path, None
+    return image_path, int(index)
+
+
+class SpriteSheet(object):
+    """
+    The frame grid of a single sheet image
+    """
+    def __init__(self, image_path: str, info: dict):
+        self._image_path = image_path
+        self._info = info
+
+        self.frame_width = info['frame_width']
+        self.frame_height = info['frame_height']
+        self.frames = info['frames']
+        self.columns = info.get('columns')
+
+    def __repr__(self):
+        return f"<(SpriteSheet, {self._image_path}: {self.frames} frames)>"
+
+    @property
+    def image_path(self):
+        return self._image_path
+
+    @property
+    def info(self):
+        return self._info
+
+    @classmethod
+    def from_file(cls, sheet_file: str, info: dict = None):
+        """
+        :param sheet_file: The .sheet descriptor
+        :param info: The already parsed (and validated) descriptor
+        :return: SpriteSheet for the image next to the descriptor
+        """
+        if info is None:
+            info = cls.validate_info(sheet_file, read_info(sheet_file))
+        return cls(sheet_file[:-len(SHEET_EXT)] + '.png', info)
+
+    @classmethod
+    def validate_info(cls, sheet_file: str, info) -> dict:
+        """
+        Verify the contents of a .sheet file
+        :return: dict
+        """
+        if not isinstance(info, dict):
+            raise RuntimeError(f"Sheet {sheet_file} must be a dict")
+
+        errors = []
+        emap(lambda x: _must_contain(info, errors, *x), [
+            ('frame_width', int),
+            ('frame_height', int),
+            ('frames', int),
+        ])
+
+        if 'columns' in info and not isinstance(info['columns'], int):
+            errors.append("'columns' should be an integer")
+
+        for key in ('frame_width', 'frame_height', 'frames', 'columns'):
+            if isinstance(info.get(key), int) and info[key] < 1:
+                errors.append(f"'{key}' must be at least 1")
+
+        if errors:
+            print (f"ERROR ON: {sheet_file}:")
+            print ("\n".join(errors))
+            raise RuntimeError("Could not start game")
+
+        return info
+
+    def frame_paths(self) -> list:
+        """
+        :return: list[str] of the frame path of each frame in order
+        """
+        return [frame_path(self._image_path, i) for i in range(self.frames)]
+
+    def slice(self, image: PIL.Image.Image) -> list:
+        """
+        Cut the sheet into it's frames
+        :param image: The decoded sheet image
+        :return: list[PIL.Image.Image] of each frame in order
+        """
+        columns = self.columns or (image.width // self.frame_width)
+        rows = -(-self.frames // max(columns, 1))
+
+        if columns < 1 or \
+           columns * self.frame_width > image.width or \
+           rows * self.frame_height > image.height:
+            raise RuntimeError(
+                f"Sheet {self._image_path} ({image.width}x{image.height}) is "
+                f"too small for {self.frames} frames of "
+                f"{self.frame_width}x{self.frame_height}"
+            )
+
+        frames = []
+        for i in range(self.frames):
+            x = (i % columns) * self.frame_width
+            y = (i // columns) * self.frame_height
+            frames.append(image.crop(
+                (x, y, x + self.frame_width, y + self.frame_height)
+            ))
+        return frames
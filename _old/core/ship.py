@@ -4,7 +4,6 @@ Base classes for the ships (player or NPC)
 
 import os
 import math
-import yaml
 import arcade
 import functools
 
@@ -13,8 +12,9 @@ from .abstract import _AbstractDrawObject, TSprite
 from .hardpoint import Hardpoint
 from .engine import Engine
 from .damage import Damage
-from .utils import _must_contain, Position, emap, _clamp
+from .utils import _must_contain, Position, PositionBuffer, emap, _clamp, frame_factor
 from . import settings
+from .protocache import read_info
 
 class ShipHardpoint(object):
     """
@@ -145,6 +145,21 @@ class Ship(TObject, _AbstractDrawObject):
         self._angle_delta = 0.0
         self._angle = 0.0
 
+        # Where we were as of the last step (for render interpolation)
+        self._previous_position = Position()
+        self._previous_angle = 0.0
+
+        #
+        # Every hardpoint and engine we carry along with their
+        # (unrotated) offset from our center. Built on first use and
+        # again if the scale or our sprite's size changes (the offsets
+        # are relative to it's center).
+        #
+        self._mounts = []
+        self._mount_offsets = None
+        self._mount_world = None
+        self._mount_key = None
+
     @property
     def display_name(self):
         return self._display_name
@@ -183,10 +198,13 @@ class Ship(TObject, _AbstractDrawObject):
 
     # -- More typical gameplay controls
 
-    @TSignal
+    @TSignal.queued
     def take_damage(self, damage: Damage):
         """
         Whenever the ship takes a select amount of damage
+
+        Listeners hear about this once per frame (with the latest
+        damage) no matter how many hits we take.
         """
         if self._shield > 0:
             self._shield = max(0, self._shield - damage.amount)
@@ -207,6 +225,21 @@ class Ship(TObject, _AbstractDrawObject):
             if sh.command == command:
                 sh.fire()
 
+    def cease_command(self, command):
+        """
+        Release a command given to fire_command() (e.g. stop
+        automatic fire)
+
+        :param command: The action that we're stopping
+        :return: None
+        """
+        for sh in self._hardpoints:
+            if not sh.hardpoint:
+                continue
+
+            if sh.command == command:
+                sh.cease_fire()
+
     @property
     def thrust(self):
         return self._thrust
@@ -244,33 +277,173 @@ class Ship(TObject, _AbstractDrawObject):
         The ship piloting logic goes in herew
         :note: We work in 2 dimentions with nealy everything here
         """
-        self._speed.drag_calculation(self._drag)
+        factor = frame_factor(delta_time)
+        self._speed.drag_calculation(self._drag, factor)
 
-        self._speed += self._thrust
+        self._speed.x += self._thrust.x * factor
+        self._speed.y += self._thrust.y * factor
         ms = self.max_speed()
         self._speed.clamp(-ms, ms)
 
-        self._angle += self.angle_delta
-        self._change.x = -math.sin(math.radians(self._angle)) * self._speed.y
-        self._change.y = math.cos(math.radians(self._angle)) * self._speed.y
+        self._previous_position.set(self._position.x, self._position.y)
+        self._previous_angle = self._angle
 
-        self._change.x += -math.sin(math.radians(self._angle + 90)) * self._speed.x
-        self._change.y += math.cos(math.radians(self._angle + 90)) * self._speed.x
+        self._angle += self.angle_delta * factor
+        rads = math.radians(self._angle)
+        sin = math.sin(rads)
+        cos = math.cos(rads)
 
-        s = self.sprite()
-        s.center_x += self._change.x
-        s.center_y += self._change.y
-        s.angle = int(self._angle)
-        self.set_position(Position(s.center_x, s.center_y))
+        # Forward along our heading, sideways (strafe) 90 degrees off it
+        self._change.set(
+            -sin * self._speed.y - cos * self._speed.x,
+            cos * self._speed.y - sin * self._speed.x
+        )
+        self._position.x += self._change.x * factor
+        self._position.y += self._change.y * factor
+
+        # Collisions are tested against our sprite at the current step
+        self._place_sprite(self._position.x, self._position.y, self._angle)
 
         super().update(delta_time)
 
         # Update all the components as well
+        self._update_mounts()
         emap(lambda x: x.update(delta_time), self._hardpoints)
         emap(lambda x: x.update(delta_time), self._engines)
 
+    def set_position(self, position: Position):
+        """
+        Move the ship outright (no interpolation from where we were)
+        """
+        super().set_position(position)
+        self._previous_position.set(position.x, position.y)
+        if self._sprite is not None:
+            self._place_sprite(position.x, position.y, self._angle)
+
+    def _place_sprite(self, x: (int, float), y: (int, float), angle: (int, float)):
+        s = self.sprite()
+        s.center_x = x
+        s.center_y = y
+        s.angle = int(angle)
+        self.moved()
+
+    def interpolate(self, alpha: float):
+        """
+        Place our sprite (and our mounts) between the previous and
+        current step for drawing
+        :param alpha: 0.0 (previous step) to 1.0 (current step)
+        """
+        previous = self._previous_position
+        x = previous.x + (self._position.x - previous.x) * alpha
+        y = previous.y + (self._position.y - previous.y) * alpha
+        angle = self._previous_angle + (self._angle - self._previous_angle) * alpha
+
+        self._place_sprite(x, y, angle)
+        self._draw_mounts(x, y, angle)
+
+    def _mount_cache_key(self) -> tuple:
+        """
+        :return: Everything our mount offsets are derived from
+        """
+        ship_sprite = self.sprite()
+        return (
+            settings.get_setting('global_scale', 1.0),
+            ship_sprite.width,
+            ship_sprite.height
+        )
+
+    def _build_mount_cache(self, key: tuple):
+        """
+        Gather all of our mounts and their local offsets into
+        one array so we can transform them in one punch.
+        :param key: See _mount_cache_key()
+        """
+        scale = key[0]
+
+        ship_sprite = self.sprite()
+        ship_center = Position(
+            ship_sprite.width / 2,
+            ship_sprite.height / 2
+        )
+
+        self._mounts = [
+            sh.hardpoint for sh in self._hardpoints if sh.hardpoint
+        ] + [se.engine for se in self._engines]
+
+        self._mount_offsets = PositionBuffer(
+            [m.mount_offset(ship_center, scale) for m in self._mounts]
+        )
+        self._mount_world = PositionBuffer(len(self._mounts))
+        self._mount_key = key
+
+    def _transform_mounts(self,
+                          x: (int, float),
+                          y: (int, float),
+                          angle: (int, float)) -> PositionBuffer:
+        """
+        :return: The world position of each of our mounts were we to
+        sit at x, y and angle (valid until the next call)
+        """
+        key = self._mount_cache_key()
+        if key != self._mount_key:
+            self._build_mount_cache(key)
+
+        world = self._mount_offsets.rotate(angle, out=self._mount_world)
+        world.translate(x, y)
+        return world
+
+    def _update_mounts(self):
+        """
+        Place all of our hardpoints and engines relative to our
+        current position and angle (once per step)
+        """
+        angle = self._angle
+        world = self._transform_mounts(
+            self._position.x, self._position.y, angle
+        )
+        for mount, (x, y) in zip(self._mounts, world):
+            mount.set_mount_position(x, y, angle)
+
+    def _draw_mounts(self,
+                     x: (int, float),
+                     y: (int, float),
+                     angle: (int, float)):
+        """
+        Place what our mounts draw between steps. Their own positions
+        (where we fire from) are left to _update_mounts()
+        """
+        world = self._transform_mounts(x, y, angle)
+        for mount, (mx, my) in zip(self._mounts, world):
+            mount.draw_at(mx, my, angle)
+
     # -- Base Class Requirements
 
+    def set_in_scene(self, in_scene: bool):
+        """
+        Ships in the scene can be hit by projectiles
+        """
+        super().set_in_scene(in_scene)
+
+        from .collision import CollisionEngine
+        if in_scene:
+            CollisionEngine().add_hull(self)
+        else:
+            CollisionEngine().remove_hull(self)
+
+            # Engines stay resident while we fly (see Engine.engage)
+            for se in self._engines:
+                if se.engine.is_in_scene:
+                    se.engine.remove_from_scene()
+
+    def teardown(self):
+        """
+        Take our engines with us (they may have loaded a sprite for
+        their offset without ever being engaged)
+        """
+        super().teardown()
+        for se in self._engines:
+            se.engine.teardown()
+
     def draw_method(self):
         """ This is a sprite based object """
         return _AbstractDrawObject.SPRITE_BASED
@@ -282,10 +455,13 @@ class Ship(TObject, _AbstractDrawObject):
         return self.default_sprite(self._data_location)
 
     @classmethod
-    def new_ship(cls, name: str, position: Position = Position(10, 10)):
+    def new_ship(cls, name: str, position: Position = None):
         """
         Build and return a ship object to the game instance 
         """
+        if position is None:
+            position = Position(10, 10)
+
         if name not in cls._ship_prototypes:
             raise RuntimeError(f"Unknown ship prototype: {name}")
 
@@ -294,24 +470,52 @@ class Ship(TObject, _AbstractDrawObject):
         return ship
 
     @classmethod
-    def add_prototype(cls, name: str, info_file: str):
+    def add_prototype(cls, name: str, info_file: str, cache = None):
         """
         Verify all the information from a .si file
         :param name: The name of the ship
         :param info_file: The .si file that should conatin the ship info
-        :return: tuple(list[str], dict|None) (errors, information)
+        :param cache: Optional PrototypeCache (or AssetArchive) to skip parsing
+        unchanged files
+        :return: None
         """
-        errors = []
-        if not os.path.isfile(info_file):
-            raise RuntimeError(
-                f"Could not start game! {name} info file needed"
+        def _validate(info):
+            return cls.validate_info(name, info_file, info)
+
+        def _depends(info):
+            # Our required sprite and wherever our defaults come from
+            files = [os.path.join(os.path.dirname(info_file), 'life/static.png')]
+            files.extend(
+                Hardpoint.prototype_file(hp_info['default'])
+                for hp_info in info.get('hardpoints', [])
             )
+            files.extend(
+                Engine.prototype_file(engine_info['default'])
+                for engine_info in info.get('engines', [])
+            )
+            return [f for f in files if f is not None]
+
+        if cache is not None:
+            info = cache.fetch(info_file, _validate, _depends)
+        else:
+            if not os.path.isfile(info_file):
+                raise RuntimeError(
+                    f"Could not start game! {name} info file needed"
+                )
+            info = _validate(read_info(info_file))
 
-        try:
-            with open(info_file, 'r') as f:
-                info = yaml.safe_load(f)
-        except Exception as e:
-            raise RuntimeError(str(e))
+        cls._ship_prototypes[info['display_name']] = info
+
+    @classmethod
+    def validate_info(cls, name: str, info_file: str, info) -> dict:
+        """
+        Verify the contents of a ship's .si file
+        :param name: The name of the ship
+        :param info_file: The .si file (for locating data)
+        :param info: The parsed yaml of the file
+        :return: dict of ship information
+        """
+        errors = []
 
         if not isinstance(info, dict):
             # We can't load anything else
@@ -367,4 +571,4 @@ class Ship(TObject, _AbstractDrawObject):
             )
 
         info['data_directory'] = os.path.dirname(info_file)
-        cls._ship_prototypes[info['display_name']] = info
+        return info
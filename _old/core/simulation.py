@@ -0,0 +1,125 @@
+"""
+The game world without the window
+"""
+
+from . import settings
+from .projectile import ProjectileEngine
+from .collision import CollisionEngine
+
+class Simulation(object):
+    """
+    Owns the stepping of everything that moves: ships (and their
+    mounts), projectiles and collisions.
+
+    Nothing in here needs a GL context so it can be driven by the
+    Spaceman window or headless (see spaceman.bench).
+
+    The window feeds real time into advance() which runs a fixed size
+    step (the 'sim_rate' setting, per second) as many times as that time
+    covers - possibly not at all. Drawing then calls interpolate() to
+    place sprites between the last two steps.
+    """
+    DEFAULT_RATE = 60
+
+    # Most steps we'll run to catch up in a single advance() (after a
+    # long hitch we drop the time rather than spiral)
+    MAX_STEPS = 5
+
+    def __init__(self):
+        # Ships we step each tick (insertion ordered)
+        self._ships = {}
+        self._ticks = 0
+
+        self._accumulator = 0.0
+        self._alpha = 1.0
+
+    def __len__(self):
+        return len(self._ships)
+
+    @property
+    def ships(self):
+        return list(self._ships)
+
+    @property
+    def step_time(self) -> float:
+        """
+        :return: Seconds covered by a single step
+        """
+        return 1.0 / settings.get_setting('sim_rate', Simulation.DEFAULT_RATE)
+
+    @property
+    def alpha(self) -> float:
+        """
+        :return: How far (0.0 - 1.0) real time is between the last step
+        and the next one
+        """
+        return self._alpha
+
+    @property
+    def ticks(self):
+        """
+        :return: The number of times we've stepped
+        """
+        return self._ticks
+
+    def add_ship(self, ship):
+        """
+        Step a ship within this simulation. Ships still have to be
+        added to the scene to be drawn and hit.
+        """
+        self._ships[ship] = None
+
+    def remove_ship(self, ship):
+        self._ships.pop(ship, None)
+
+    def clear(self):
+        """
+        Tear down every ship and drop all live projectiles
+        """
+        for ship in self._ships:
+            ship.teardown()
+        self._ships.clear()
+        ProjectileEngine().clear()
+
+    def step(self, delta_time: float):
+        """
+        Advance the world by a single tick
+        :param delta_time: Seconds since the last step
+        :return: None
+        """
+        for ship in self._ships:
+            ship.update(delta_time)
+
+        ProjectileEngine().update(delta_time)
+        CollisionEngine().update(delta_time)
+
+        self._ticks += 1
+
+    def advance(self, delta_time: float) -> int:
+        """
+        Run as many fixed steps as delta_time (real seconds) covers
+        :return: The number of steps taken
+        """
+        step_time = self.step_time
+        self._accumulator += delta_time
+
+        steps = 0
+        while self._accumulator >= step_time and steps < Simulation.MAX_STEPS:
+            self.step(step_time)
+            self._accumulator -= step_time
+            steps += 1
+
+        if steps == Simulation.MAX_STEPS:
+            self._accumulator = min(self._accumulator, step_time)
+
+        self._alpha = min(self._accumulator / step_time, 1.0)
+        return steps
+
+    def interpolate(self):
+        """
+        Place everything between the previous and current step (see
+        alpha) ready for drawing
+        """
+        for ship in self._ships:
+            ship.interpolate(self._alpha)
+        ProjectileEngine().interpolate(self._alpha)
@@ -0,0 +1,123 @@
+"""
+Spatial lookup tools
+"""
+
+import math
+
+from .utils import Rect
+
+class SpatialHash(object):
+    """
+    A uniform grid that buckets objects by the cells their bounds
+    cover. Lookups only need to visit the cells around the query
+    rather than every object we know about.
+    """
+    def __init__(self, cell_size: (int, float) = 128):
+        self._cell_size = cell_size
+
+        # (cell_x, cell_y) -> set(objects)
+        self._cells = {}
+
+        # object -> tuple(cells,) it currently occupies
+        self._object_cells = {}
+
+    def __len__(self):
+        return len(self._object_cells)
+
+    def __contains__(self, obj):
+        return obj in self._object_cells
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    def cells(self):
+        """
+        :return: The keys of every occupied cell
+        """
+        return self._cells.keys()
+
+    def cell_of(self, x: (int, float), y: (int, float)) -> tuple:
+        """
+        :return: The key of the cell containing the point
+        """
+        return (
+            math.floor(x / self._cell_size),
+            math.floor(y / self._cell_size)
+        )
+
+    def _cells_for(self, rect: Rect) -> tuple:
+        """
+        :return: tuple of all cell keys the rect covers
+        """
+        low_x, low_y = self.cell_of(rect.x, rect.y)
+        high_x, high_y = self.cell_of(rect.x + rect.w, rect.y + rect.h)
+        return tuple(
+            (cx, cy)
+            for cx in range(low_x, high_x + 1)
+            for cy in range(low_y, high_y + 1)
+        )
+
+    def insert(self, obj, rect: Rect):
+        """
+        Add an object that covers rect
+        """
+        if obj in self._object_cells:
+            self.move(obj, rect)
+            return
+
+        cells = self._cells_for(rect)
+        self._object_cells[obj] = cells
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(obj)
+
+    def remove(self, obj):
+        """
+        Drop an object from the grid (if we have it)
+        """
+        cells = self._object_cells.pop(obj, ())
+        for cell in cells:
+            bucket = self._cells[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del self._cells[cell]
+
+    def move(self, obj, rect: Rect):
+        """
+        Update the bounds of an object we already hold. When the object
+        hasn't left it's cells, this does nothing.
+        """
+        cells = self._cells_for(rect)
+        if self._object_cells.get(obj) == cells:
+            return
+
+        self.remove(obj)
+        self._object_cells[obj] = cells
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(obj)
+
+    def clear(self):
+        self._cells.clear()
+        self._object_cells.clear()
+
+    def query_cell(self, cell: tuple) -> set:
+        """
+        :return: set of objects within a single cell (do not modify)
+        """
+        return self._cells.get(cell, ())
+
+    def query_point(self, x: (int, float), y: (int, float)) -> set:
+        """
+        :return: set of objects whose cells contain the point (do not modify)
+        """
+        return self.query_cell(self.cell_of(x, y))
+
+    def query(self, rect: Rect) -> set:
+        """
+        :return: set of objects whose cells overlap rect
+        """
+        found = set()
+        for cell in self._cells_for(rect):
+            if cell in self._cells:
+                found.update(self._cells[cell])
+        return found
@@ -0,0 +1,232 @@
+"""
+Texture loading and sharing
+"""
+
+import collections
+
+import arcade
+import PIL.Image
+
+from . import settings
+
+class _TextureEntry(object):
+    """
+    A single loaded texture and who's using it
+    """
+    def __init__(self, key: tuple, texture: arcade.Texture):
+        self.key = key
+        self.texture = texture
+        self.references = 0
+
+        # Rough footprint of the decoded RGBA pixels
+        self.size = int(texture.width * texture.height * 4)
+
+
+class TextureCache(object):
+    """
+    Singleton registry that hands out shared arcade.Texture objects keyed
+    by (path, scale).
+
+    Every acquire() must be paired with a release(). Textures nobody is
+    using stay around (least recently used first out) until the loaded
+    total goes over the 'texture_cache_budget' setting.
+
+    The budget covers everything we hold pixels for: loaded textures
+    and images staged ahead of time. Staged images are dropped (after unused textures) when we're over as they
+    can always be decoded again.
+    """
+
+    # Bytes of decoded pixels we're willing to hold on to
+    DEFAULT_BUDGET = 64 * 1024 * 1024
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_entries'):
+            # (path, scale) -> _TextureEntry, oldest use first
+            self._entries = collections.OrderedDict()
+
+        if not hasattr(self, '_by_texture'):
+            # arcade.Texture -> _TextureEntry
+            self._by_texture = {}
+
+        if not hasattr(self, '_size'):
+            self._size = 0
+
+        if not hasattr(self, '_staged'):
+            # path -> PIL.Image decoded ahead of time (see stage())
+            self._staged = {}
+            self._staged_size = 0
+
+        if not hasattr(self, '_archive'):
+            self._archive = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: tuple):
+        return key in self._entries
+
+    @property
+    def size(self):
+        """
+        :return: Approximate bytes of pixels we're holding (loaded
+        and staged)
+        """
+        return self._size + self._staged_size
+
+    def acquire(self, path: str, scale: (int, float) = None) -> arcade.Texture:
+        """
+        Get the shared texture for an image
+        :param path: The image file
+        :param scale: The scale of the texture (global_scale when None)
+        :return: arcade.Texture
+        """
+        if scale is None:
+            scale = settings.get_setting('global_scale', 1.0)
+
+        key = (path, scale)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _TextureEntry(key, self._load(path, scale))
+            self._entries[key] = entry
+            self._by_texture[entry.texture] = entry
+            self._size += entry.size
+        else:
+            self._entries.move_to_end(key)
+
+        entry.references += 1
+        self._evict()
+        return entry.texture
+
+    def release(self, texture: arcade.Texture):
+        """
+        Let the cache know we're done with a texture from acquire()
+        """
+        entry = self._by_texture.get(texture)
+        if entry is None:
+            return
+
+        entry.references = max(0, entry.references - 1)
+        if not entry.references:
+            self._evict()
+
+    def stage(self, path: str, image: PIL.Image.Image):
+        """
+        Hand over the already decoded pixels of an image so that the
+        first acquire() doesn't have to go to disk.
+        """
+        self._unstage(path)
+        self._staged[path] = image
+        self._staged_size += _image_size(image)
+
+    def _unstage(self, path: str) -> PIL.Image.Image:
+        """
+        :return: The staged pixels of an image (no longer staged) or None
+        """
+        image = self._staged.pop(path, None)
+        if image is not None:
+            self._staged_size -= _image_size(image)
+        return image
+
+    def set_archive(self, archive):
+        """
+        Read image pixels from an AssetArchive rather than the disk
+        """
+        self._archive = archive
+
+    def _load(self, path: str, scale: (int, float)) -> arcade.Texture:
+        """
+        Build a texture from staged or archived pixels when we have
+        them, otherwise decode it from disk
+        """
+        image = self._unstage(path)
+        if image is None:
+            from .sheet import split_frame_path
+            sheet_path, index = split_frame_path(path)
+            if index is not None:
+                # A frame of a sprite sheet we haven't staged
+                self._stage_sheet(sheet_path)
+                image = self._unstage(path)
+                if image is None:
+                    raise RuntimeError(f"No frame {index} in sheet {sheet_path}")
+
+        if image is None and self._archive is not None:
+            image = self._archive.image(path)
+
+        if image is None:
+            # We decode it ourselves rather than arcade.load_texture() so
+            # the pixels aren't held on to by arcade's own cache
+            image = decode_image(path)
+
+        texture = arcade.Texture(f"{path}-{scale}", image)
+        texture.scale = scale
+        return texture
+
+    def _stage_sheet(self, image_path: str):
+        """
+        Decode a sprite sheet once and stage every one of it's frames
+        """
+        from .manifest import AssetManifest
+        sheet = AssetManifest().sheet(image_path)
+        if sheet is None:
+            raise RuntimeError(f"{image_path} is not a sprite sheet")
+
+        image = self._unstage(image_path)
+        if image is None and self._archive is not None:
+            image = self._archive.image(image_path)
+        if image is None:
+            image = decode_image(image_path)
+
+        for path, frame in zip(sheet.frame_paths(), sheet.slice(image)):
+            self.stage(path, frame)
+
+    def _evict(self):
+        """
+        Drop unused textures, and then staged images, until we're within
+        our budget
+        """
+        budget = settings.get_setting(
+            'texture_cache_budget', TextureCache.DEFAULT_BUDGET
+        )
+        excess = self.size - budget
+        if excess <= 0:
+            return
+
+        for entry in list(self._entries.values()):
+            if excess <= 0:
+                break
+
+            if entry.references:
+                continue
+
+            del self._entries[entry.key]
+            del self._by_texture[entry.texture]
+            self._size -= entry.size
+            excess -= entry.size
+
+        # Oldest first - these are decoded again if they're asked for
+        for path in list(self._staged):
+            if excess <= 0:
+                break
+            excess -= _image_size(self._unstage(path))
+
+
+def _image_size(image: PIL.Image.Image) -> int:
+    """
+    :return: Rough footprint of an image as RGBA pixels
+    """
+    return int(image.width * image.height * 4)
+
+def decode_image(path: str) -> PIL.Image.Image:
+    """
+    Read and decode an image into RGBA pixels. Safe to run on a worker
+    thread (PIL lets go of the GIL while decoding).
+    :return: PIL.Image.Image
+    """
+    with PIL.Image.open(path) as image:
+        return image.convert('RGBA')
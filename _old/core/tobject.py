@@ -2,67 +2,191 @@
 Base object for fun event handling
 """
 
+import types
 import inspect
+import weakref
 import functools
 
-from .utils import emap
+def _listener_key(function):
+    """
+    :return: A hashable key for a listener. Bound methods are created anew
+    on each attribute access so we key those by their instance and function
+    """
+    if inspect.ismethod(function):
+        return (id(function.__self__), function.__func__)
+    return id(function)
+
+def _listener_ref(function, on_death):
+    """
+    :return: A callable that returns the listener or None once it's gone
+    """
+    if inspect.ismethod(function):
+        return weakref.WeakMethod(function, on_death)
+
+    if isinstance(function, (types.FunctionType,
+                             types.BuiltinFunctionType,
+                             functools.partial)):
+        #
+        # Free functions, lambdas, and partials often have nothing else
+        # holding on to them so we keep these alive ourselves
+        #
+        return lambda: function
+
+    try:
+        return weakref.ref(function, on_death)
+    except TypeError:
+        return lambda: function
 
 class TObject(object):
     """
-    In order to utilize the TSignal properly, we have to make
-    sure the objects wrap the method with our instance
+    Base class for anything that hosts TSignals.
+
+    Signals bind themselves to each instance the first time they're
+    accessed (see TSignal.__get__) so construction doesn't need to go
+    looking for them.
     """
     def __init__(self, *args, **kwargs):
-        for name, method in inspect.getmembers(self):
-            if isinstance(method, TSignal):
-                #
-                # Build a custom signal object for each instance
-                # to avoid any overlap
-                #
-                wrapped = functools.partial(method._func, self)
-                setattr(self, name, TSignal(wrapped))
+        pass
+
+class EventQueue(object):
+    """
+    Singleton that holds on to the post events of queued signals until
+    the frame drains them (once, before rendering).
+
+    Events are keyed by the bound signal, and thereby the sender, so
+    posting the same signal many times in a frame collapses into a single
+    dispatch with the most recent arguments.
+    """
+
+    # Events posted while draining are handled in another pass. This
+    # keeps a signal loop from locking up the frame
+    MAX_PASSES = 8
+
+    # This is a singleton
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instance'):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_events'):
+            self._events = {}
+
+    def __len__(self):
+        return len(self._events)
+
+    def post(self, signal, args: tuple, kwargs: dict):
+        """
+        Queue the post events of a signal
+        """
+        self._events[signal] = (args, kwargs)
+
+    def drain(self):
+        """
+        Dispatch everything that's been posted
+        :return: None
+        """
+        passes = 0
+        while self._events and passes < EventQueue.MAX_PASSES:
+            events, self._events = self._events, {}
+            for signal, (args, kwargs) in events.items():
+                signal._dispatch_post(args, kwargs)
+            passes += 1
+
 
 class TSignal(object):
     """
     Decorator for simple pre/post callback setup
+
+    Use @TSignal.queued for signals that may fire in bursts. Their pre
+    events and function still run right away but the post events go through
+    the EventQueue and are coalesced to once per frame.
+
+    Listeners are keyed (connecting the same one twice replaces it) and
+    bound methods or callable objects are only weakly referenced. They are
+    dropped on their own once the listening object is collected.
     """
-    def __init__(self, func):
+    def __init__(self, func, queued: bool = False):
         self._func = func
-        self._pre_events  = []
-        self._post_events = []
+        self._queued = queued
+        self._name = None
+        # key -> (ref, args, kwargs)
+        self._pre_events  = {}
+        self._post_events = {}
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner):
+        """
+        The first time an instance asks for this signal we build a custom
+        signal object for it, to avoid any overlap, and store it on the
+        instance. Every lookup after that finds the bound signal in the
+        instance __dict__ and never reaches us again.
+        """
+        if instance is None:
+            return self
+
+        bound = TSignal(functools.partial(self._func, instance), self._queued)
+        instance.__dict__[self._name] = bound
+        return bound
 
     def __call__(self, *args, **kwargs):
         """
         When we call the function, we have the pre and post events
         do their bidding.
         """
-        for call, a, k in self._pre_events:
-            call(*a, *args, **k, **kwargs)
+        for ref, a, k in tuple(self._pre_events.values()):
+            call = ref()
+            if call is not None:
+                call(*a, *args, **k, **kwargs)
 
         self._func(*args, **kwargs)
 
-        for call, a, k in self._post_events:
-            call(*a, *args, **k, **kwargs)        
+        if self._queued:
+            EventQueue().post(self, args, kwargs)
+        else:
+            self._dispatch_post(args, kwargs)
+
+    @classmethod
+    def queued(cls, func):
+        """
+        Decorator for a signal with deferred post events
+        """
+        return cls(func, queued=True)
+
+    @property
+    def is_queued(self):
+        return self._queued
+
+    def _dispatch_post(self, args: tuple, kwargs: dict):
+        for ref, a, k in tuple(self._post_events.values()):
+            call = ref()
+            if call is not None:
+                call(*a, *args, **k, **kwargs)
+
+    @staticmethod
+    def _connect(events: dict, function, args: tuple, kwargs: dict):
+        """
+        Store a listener within one of our event dictionaries
+        """
+        key = _listener_key(function)
+
+        def _on_death(_, events=events, key=key):
+            events.pop(key, None)
+
+        events[key] = (_listener_ref(function, _on_death), args, kwargs)
 
     def listen_pre(self, function, *args, **kwargs):
-        self._pre_events.append((function, args, kwargs))
+        TSignal._connect(self._pre_events, function, args, kwargs)
 
     def listen_post(self, function, *args, **kwargs):
-        self._post_events.append((function, args, kwargs))
+        TSignal._connect(self._post_events, function, args, kwargs)
 
     def stop_listening(self, function):
         """
         Stop using the callback on the provided function
         """
-        pre_to_remove = []
-        post_to_remove = []
-        for e in self._pre_events:
-            if e[0] == function:
-                pre_to_remove.append(e)
-
-        for e in self._post_events:
-            if e[0] == function:
-                post_to_remove.append(e)
-
-        emap(lambda x: self._pre_events.remove(x), pre_to_remove)
-        emap(lambda x: self._post_events.remove(x), post_to_remove)
\ No newline at end of file
+        key = _listener_key(function)
+        self._pre_events.pop(key, None)
+        self._post_events.pop(key, None)
@@ -1,13 +1,26 @@
 import arcade
+import numpy
 
+import math
 import time
 import collections
 
 from typing import TypeVar
 
+# Our movement constants (speeds, drag, turn rates, ...) are tuned as
+# amounts per frame at this rate
+FRAME_RATE = 60
+
 def _clamp(low, val, high):
     return max(min(val, high), low)
 
+def frame_factor(delta_time: float) -> float:
+    """
+    :return: How many FRAME_RATE frames delta_time covers. Scale any per
+    frame amount by this to keep it independent of the update rate.
+    """
+    return delta_time * FRAME_RATE
+
 def emap(predicate, iterable):
     """
     Pyhton 3 evaluates lazy. Which is cool. But we don't always want that
@@ -39,9 +52,13 @@ T = TypeVar('T', bound='Position')
 class Position(object):
     """
     Basic (x, y) coordinates with helper functions
+
+    The arithmetic operators return a new Position. In hot loops, prefer
+    the in-place versions (+=, iadd(), set(), ...) that reuse this one.
     """
+    __slots__ = ('x', 'y')
 
-    def __init__(self, x: (int, float, tuple, list) = [0, 0], y: (int, float, type(None)) = None):
+    def __init__(self, x: (int, float, tuple, list) = (0, 0), y: (int, float, type(None)) = None):
         if y is None:
             self.x = x[0]
             self.y = x[1]
@@ -51,8 +68,7 @@ class Position(object):
 
     def __iter__(self):
         """ Allows for dynamic unpacking (e.g. *pos) """
-        for i in (self.x, self.y):
-            yield i
+        return iter((self.x, self.y))
 
     def __eq__(self, other):
         """ Equatative math """
@@ -72,29 +88,80 @@ class Position(object):
             # dot product really...
             return Position(self.x * other.x, self.y * other.y)
         return Position(self.x * other, self.y * other)
-        
+
+    def __iadd__(self, other: T) -> T:
+        return self.iadd(other)
+
+    def __isub__(self, other: T) -> T:
+        return self.isub(other)
+
+    def __imul__(self, other: (int, float, T)) -> T:
+        return self.imul(other)
+
+    def iadd(self, other: T) -> T:
+        """
+        In-place addition
+        :return: self
+        """
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def isub(self, other: T) -> T:
+        """
+        In-place subtraction
+        :return: self
+        """
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def imul(self, other: (int, float, T)) -> T:
+        """
+        In-place multiplication (per component when given a Position)
+        :return: self
+        """
+        if isinstance(other, Position):
+            self.x *= other.x
+            self.y *= other.y
+        else:
+            self.x *= other
+            self.y *= other
+        return self
+
+    def set(self, x: (int, float), y: (int, float)) -> T:
+        """
+        Overwrite both coordinates
+        :return: self
+        """
+        self.x = x
+        self.y = y
+        return self
+
+    def copy(self) -> T:
+        return Position(self.x, self.y)
+
     def __repr__(self):
         return f"<(Position ({self.x}, {self.y}))>"
 
-    def drag_calculation(self, drag: T) -> T:
+    def drag_calculation(self, drag: T, factor: (int, float) = 1.0) -> T:
         """
         Basic drag math over a frame
+        :param drag: The drag per frame
+        :param factor: Number of frames to apply (see frame_factor())
         """
-        def _d_neg(v, o):
-            return max(v - o, 0.0)
+        dx = drag.x * factor
+        dy = drag.y * factor
 
         if self.x > 0:
-            self.x = _d_neg(self.x, drag.x)
-        if self.y > 0:
-            self.y = _d_neg(self.y, drag.y)
-
-        def _d_pos(v, o):
-            return min(v + o, 0.0)
+            self.x = max(self.x - dx, 0.0)
+        elif self.x < 0:
+            self.x = min(self.x + dx, 0.0)
 
-        if self.x < 0:
-            self.x = _d_pos(self.x, drag.x)
-        if self.y < 0:
-            self.y = _d_pos(self.y, drag.y)
+        if self.y > 0:
+            self.y = max(self.y - dy, 0.0)
+        elif self.y < 0:
+            self.y = min(self.y + dy, 0.0)
 
         return self
 
@@ -125,6 +192,80 @@ class Position(object):
         self.y = _clamp(low_y, self.y, high_y)
         return self
 
+class PositionBuffer(object):
+    """
+    Many (x, y) coordinates in one contiguous (n, 2) array for when we
+    move a group of entities together (e.g. the mounts of a ship).
+    Transforms happen in place so a buffer can be reused every frame.
+    """
+    __slots__ = ('_array',)
+
+    def __init__(self, positions: (int, list) = 0):
+        """
+        :param positions: The number of (zeroed) coordinates or a list of
+        Position/(x, y) to start with
+        """
+        if isinstance(positions, int):
+            self._array = numpy.zeros((positions, 2))
+        else:
+            self._array = numpy.array(
+                [tuple(p) for p in positions], dtype=float
+            ).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, index: int) -> Position:
+        return Position(*self._array[index].tolist())
+
+    def __iter__(self):
+        """ Yields tuple(x, y) for each coordinate """
+        return iter(map(tuple, self._array.tolist()))
+
+    @property
+    def array(self) -> numpy.ndarray:
+        return self._array
+
+    def get(self, index: int, out: Position) -> Position:
+        """
+        Copy a coordinate into an existing Position
+        :return: out
+        """
+        x, y = self._array[index].tolist()
+        return out.set(x, y)
+
+    def set(self, index: int, x: (int, float), y: (int, float)):
+        self._array[index, 0] = x
+        self._array[index, 1] = y
+
+    def translate(self, x: (int, float), y: (int, float)):
+        """
+        Move every coordinate by (x, y)
+        """
+        self._array += (x, y)
+
+    def rotate(self, angle: (int, float), out = None):
+        """
+        Rotate every coordinate about the origin
+        :param angle: Degrees (counter clockwise)
+        :param out: Optional PositionBuffer of the same length to write
+        into. We rotate ourselves when None.
+        :return: The rotated PositionBuffer
+        """
+        rads = math.radians(angle)
+        cos = math.cos(rads)
+        sin = math.sin(rads)
+
+        # Row vector form of the rotation (coordinates @ R^T)
+        rotation = numpy.array([
+            [cos,  sin],
+            [-sin, cos]
+        ])
+
+        out = self if out is None else out
+        numpy.matmul(self._array, rotation, out=out._array)
+        return out
+
 class Rect(object):
     """
     A rectangle in space somewhere
@@ -191,10 +332,19 @@ class Rect(object):
             max(self.bottom, other.bottom)
         )
 
+    def intersects(self, other) -> bool:
+        """
+        :return: True if the two rects overlap
+        """
+        return (
+            self.x < other.right and other.x < self.right and\
+            self.y < other.bottom and other.y < self.bottom
+        )
+
     def contains(self, position: Position) -> bool:
         return (
             self.x < position.x and (self.x + self.w) > position.x and\
-            self.h < position.y and (self.y + self.h) > position.y
+            self.y < position.y and (self.y + self.h) > position.y
         )
 
 class Depths(object):
@@ -8,8 +8,10 @@ from .hardpoint import Hardpoint
 from .engine import Engine
 from .player import Player
 from .ship import Ship
+from .simulation import Simulation
+from .animation import AnimationClock
 
-from .tobject import TObject, TSignal
+from .tobject import TObject, TSignal, EventQueue
 from .abstract import DrawEvent
 from .utils import Position, FPSCounter
 from .render import RenderEngine
@@ -69,6 +71,9 @@ class Spaceman(TObject, arcade.Window):
         self._camp_loader = CampaignLoader()
         self._campaign = None # We load this later
 
+        # Everything that moves in the world
+        self._simulation = Simulation()
+
         # The players active ship
         self._player = Player()
 
@@ -82,6 +87,10 @@ class Spaceman(TObject, arcade.Window):
     def data_path(self):
         return self._data_path
 
+    @property
+    def simulation(self):
+        return self._simulation
+
     def setup(self):
         """
         We setup the game!
@@ -100,6 +109,13 @@ class Spaceman(TObject, arcade.Window):
 
     # -- Overloaded interface
 
+    def on_resize(self, width, height):
+        """
+        Keep our camera the size of the window
+        """
+        super().on_resize(width, height)
+        self._render_engine.camera.resize(width, height)
+
     def on_key_press(self, key, modifiers):
         """
         When we press a key
@@ -144,6 +160,17 @@ class Spaceman(TObject, arcade.Window):
         """
         arcade.start_render()
 
+        # Anything queued up this frame goes out before we draw
+        EventQueue().drain()
+
+        # Draw between the last two simulation steps
+        self._simulation.interpolate()
+
+        # Keep the player in the middle of the screen
+        if self._player.ship:
+            ship = self._player.ship.sprite()
+            self._render_engine.camera.center_on(ship.center_x, ship.center_y)
+
         #
         # We oush all of the render logic to our engine
         #
@@ -164,3 +191,7 @@ class Spaceman(TObject, arcade.Window):
         gl.glTexParameterf(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
 
         self._player.update(delta_time)
+        self._simulation.advance(delta_time)
+
+        # Sprite animations run on real time
+        AnimationClock().advance(delta_time)
@@ -2,76 +2,187 @@
 Simple starfield that understands paralax
 """
 
-import os
-import arcade
 import random
+import collections
+
+import arcade
 
+from ..core import settings
 from ..core.abstract import _AbstractDrawObject, DrawEvent
 from ..core.utils import Depths, Position
 
+class _StarLayer(object):
+    """
+    A single parallax layer of stars. Moves at `factor` of the camera
+    (0.0 is fixed to the screen, 1.0 moves with the world)
+    """
+    def __init__(self, index: int, factor: float, size: int, count: int, colors: tuple):
+        self.index = index
+        self.factor = factor
+        self.size = size
+        self.count = count
+        self.colors = colors
+
+        # The chunks we're currently drawing and the batched shapes of them
+        self.chunks = ()
+        self.shapes = None
+
+
 class Starfield(_AbstractDrawObject):
+    """
+    An endless field of stars. Space is cut into square chunks and the
+    stars of any chunk are generated from a hash of the seed and the
+    chunk's coordinates, so nothing has to be stored and the same chunk
+    always looks the same.
+
+    The vertices of recently seen chunks are kept in a small LRU and
+    each layer is drawn in a single batched call.
+    """
 
     STAR_COUNT = 200.0
 
-    def __init__(self, window, density: float = 1.0):
+    # Size (in layer space) of a single chunk
+    CHUNK_SIZE = 512
+
+    # Chunk shapes we hold onto (across all layers)
+    CHUNK_CACHE = 96
+
+    # (parallax factor, star size, share of the stars, colors) - far to near
+    LAYERS = (
+        (0.1, 1, 0.5, ((90, 90, 110), (120, 120, 130))),
+        (0.3, 2, 0.33, ((150, 150, 160), (170, 160, 140))),
+        (0.6, 3, 0.17, ((210, 210, 220), (230, 220, 200))),
+    )
+
+    def __init__(self, window, density: float = 1.0, seed: int = None):
         super().__init__()
 
         self.set_z_depth(Depths.STAR_FIELD)
 
         self._window = window
         self._denisty = density
+        self._seed = settings.get_setting('starfield_seed', 0) \
+                     if seed is None else seed
+
+        # (layer, chunk_x, chunk_y) -> arcade.Shape, oldest use first
+        self._chunk_cache = collections.OrderedDict()
+
+        self._layers = []
+        self._build_layers()
 
-        self._small_stars = arcade.SpriteList()
-        self._bigger_stars = arcade.SpriteList()
-        self._build_star_layout()
+    @property
+    def seed(self):
+        return self._seed
 
     def set_density(self, density: float):
         """
         How populated is this starfield?
         """
         self._denisty = density
+        self._build_layers()
 
     def reset(self):
         """
         Create a new starfield
         """
-        self._build_star_layout()
+        self._seed = random.getrandbits(32)
+        self._build_layers()
 
     def draw_method(self):
         """
-        We paint things manually even though they are sprites
+        We paint things manually
         """
         return _AbstractDrawObject.PAINT_BASED
 
     def paint(self, draw_event: DrawEvent):
         """
-        We paint our starts manually given our points
+        Draw each layer, offset to give the parallax effect
         """
-        self._small_stars.draw()
-        self._bigger_stars.draw()
-
-    def _build_star_layout(self):
+        from ..core.render import RenderEngine
+        camera = RenderEngine().camera
+
+        for layer in self._layers:
+            # Where the camera is within this layer
+            left = camera.position.x * layer.factor
+            bottom = camera.position.y * layer.factor
+
+            chunks = self._chunks_for(left, bottom, camera.size)
+            if chunks != layer.chunks:
+                layer.chunks = chunks
+                layer.shapes = arcade.ShapeElementList()
+                for cx, cy in chunks:
+                    layer.shapes.append(self._chunk(layer, cx, cy))
+
+            # Layer space to world space
+            layer.shapes.center_x = camera.position.x * (1 - layer.factor)
+            layer.shapes.center_y = camera.position.y * (1 - layer.factor)
+            layer.shapes.draw()
+
+    def _build_layers(self):
         """
-        Build a collection of stars
+        Set up our parallax layers and forget any generated chunks
         """
-        total_stars = int(self.STAR_COUNT * self._denisty)
-        upper_third = total_stars // 3
+        self._chunk_cache.clear()
+
+        # Keep about STAR_COUNT stars on a screen sized piece of space
         screen = Position(*self._window.get_size())
+        chunks_per_screen = (screen.x * screen.y) / (Starfield.CHUNK_SIZE ** 2)
+        total = (Starfield.STAR_COUNT * self._denisty) / max(chunks_per_screen, 1e-6)
+
+        self._layers = [
+            _StarLayer(i, factor, size, int(total * share), colors)
+            for i, (factor, size, share, colors) in enumerate(Starfield.LAYERS)
+        ]
 
-        # Go get our basic star texture. (3x3 gray tile ferda!)
-        img = os.path.join(
-            self._window.data_path, "objects", "space", "star.png"
+    def _chunks_for(self, left: float, bottom: float, size: Position) -> tuple:
+        """
+        :return: tuple of the (chunk_x, chunk_y) keys that cover a
+        screen sized area of a layer
+        """
+        low_x = int(left // Starfield.CHUNK_SIZE)
+        low_y = int(bottom // Starfield.CHUNK_SIZE)
+        high_x = int((left + size.x) // Starfield.CHUNK_SIZE)
+        high_y = int((bottom + size.y) // Starfield.CHUNK_SIZE)
+        return tuple(
+            (cx, cy)
+            for cx in range(low_x, high_x + 1)
+            for cy in range(low_y, high_y + 1)
         )
-        for i in range(total_stars):
-
-            if i < upper_third:
-                l = self._bigger_stars
-                scale = 1.4 * float(random.randrange(2))
-            else:
-                l = self._small_stars
-                scale = 0.5 * float(random.randrange(2))
-
-            s = arcade.Sprite(img, scale=scale)
-            s.center_x = random.randrange(screen.x)
-            s.center_y = random.randrange(screen.y)
-            l.append(s)
+
+    def _chunk_seed(self, layer: _StarLayer, cx: int, cy: int) -> int:
+        """
+        Mix our seed with the chunk coordinates
+        """
+        h = self._seed & 0xFFFFFFFF
+        for v in (layer.index, cx, cy):
+            h = ((h ^ (v & 0xFFFFFFFF)) * 0x01000193) & 0xFFFFFFFF
+        return h
+
+    def _chunk(self, layer: _StarLayer, cx: int, cy: int):
+        """
+        :return: The arcade.Shape holding every star within a chunk
+        """
+        key = (layer.index, cx, cy)
+        shape = self._chunk_cache.get(key)
+        if shape is not None:
+            self._chunk_cache.move_to_end(key)
+            return shape
+
+        rng = random.Random(self._chunk_seed(layer, cx, cy))
+        origin_x = cx * Starfield.CHUNK_SIZE
+        origin_y = cy * Starfield.CHUNK_SIZE
+        s = layer.size
+
+        points = []
+        colors = []
+        for _ in range(layer.count):
+            x = origin_x + rng.random() * Starfield.CHUNK_SIZE
+            y = origin_y + rng.random() * Starfield.CHUNK_SIZE
+            points.extend(((x, y), (x + s, y), (x + s, y + s), (x, y + s)))
+            colors.extend((rng.choice(layer.colors),) * 4)
+
+        shape = arcade.create_rectangles_filled_with_colors(points, colors)
+        self._chunk_cache[key] = shape
+        while len(self._chunk_cache) > Starfield.CHUNK_CACHE:
+            self._chunk_cache.popitem(last=False)
+        return shape
@@ -2,10 +2,15 @@
 Acbstract interfacing tools
 """
 
+import bisect
+import itertools
+
 import arcade
 
+from ..core import settings
 from ..core.abstract import _AbstractDrawObject
-from ..core.utils import Position, Rect, emap, MouseEvent
+from ..core.spatial import SpatialHash
+from ..core.utils import Position, Rect, MouseEvent, emap
 from ..core.tobject import TObject, TSignal
 
 class _AbstractInterfaceObject(TObject, _AbstractDrawObject):
@@ -67,6 +72,7 @@ class _AbstractInterfaceObject(TObject, _AbstractDrawObject):
         Set the geometry of our object
         """
         self._geometry = geometry
+        _TWidgetManager.update_object(self)
 
     def draw_method(self):
         """
@@ -86,6 +92,11 @@ class _TWidgetManager(TObject):
     """
     Singleton manager that holds onto all widgets and dolls out
     select input events to them.
+
+    The interface objects of every shown widget (and it's children) are
+    kept in a SpatialHash per z-depth by their global geometry, so a
+    click only looks at the few objects under the mouse. The depths
+    themselves are kept sorted as widgets come and go.
     """
     def __new__(cls, *args, **kwargs):
         if not hasattr(cls, '_instance'):
@@ -97,6 +108,26 @@ class _TWidgetManager(TObject):
             # Hash of widgets to their respective z-depth
             self._known_widgets = {}
 
+        if not hasattr(self, '_depths'):
+            # Sorted list of the z-depths in _known_widgets
+            self._depths = []
+
+        if not hasattr(self, '_indices'):
+            # z-depth -> SpatialHash of interface objects
+            self._indices = {}
+
+            # Indexed widget/object -> z-depth
+            self._widget_depth = {}
+            self._object_depth = {}
+
+            # Indexed object -> global geometry when it was indexed
+            self._rects = {}
+
+            # Indexed object -> sequence (so overlapping objects are
+            # offered the click in the order they were added)
+            self._order = {}
+            self._sequence = itertools.count()
+
         if not hasattr(self, '_window'):
             self._window = None
 
@@ -106,27 +137,144 @@ class _TWidgetManager(TObject):
         m._window = window
         m._window.on_mouse_press.listen_post(m._on_mouse_press)
 
+    @staticmethod
+    def is_registered(widget) -> bool:
+        return widget in _TWidgetManager()._known_widgets.get(widget.z_depth, [])
+
     @staticmethod
     def register_widget(widget):
-        _TWidgetManager()._known_widgets.setdefault(widget.z_depth, []).append(widget)
+        m = _TWidgetManager()
+        layer = m._known_widgets.setdefault(widget.z_depth, [])
+        if widget in layer:
+            return
+
+        if not layer:
+            bisect.insort(m._depths, widget.z_depth)
+        layer.append(widget)
+        m._index_widget(widget, widget.z_depth)
 
     @staticmethod
     def deregister_widget(widget):
-        layer = _TWidgetManager()._known_widgets.get(widget.z_depth, [])
-        if widget in layer:
-            layer.remove(widget)
+        m = _TWidgetManager()
+        layer = m._known_widgets.get(widget.z_depth, [])
+        if widget not in layer:
+            return
+
+        layer.remove(widget)
+        if not layer:
+            del m._known_widgets[widget.z_depth]
+            del m._depths[bisect.bisect_left(m._depths, widget.z_depth)]
+        m._unindex_widget(widget)
+
+    @staticmethod
+    def update_widget(widget):
+        """
+        Re-index a widget (and it's children) after it's moved
+        """
+        m = _TWidgetManager()
+        if widget in m._widget_depth:
+            m._index_widget(widget, m._widget_depth[widget])
+
+    @staticmethod
+    def add_object(widget, obj):
+        """
+        Index an object that's joined an indexed widget
+        """
+        m = _TWidgetManager()
+        if widget in m._widget_depth:
+            m._index_object(obj, m._widget_depth[widget])
+
+    @staticmethod
+    def add_child(widget, child):
+        """
+        Index a child widget that's joined an indexed widget
+        """
+        m = _TWidgetManager()
+        if widget in m._widget_depth:
+            m._index_widget(child, m._widget_depth[widget])
+
+    @staticmethod
+    def update_object(obj):
+        """
+        Re-index an object after it's geometry changed
+        """
+        m = _TWidgetManager()
+        if obj in m._object_depth:
+            m._index_object(obj, m._object_depth[obj])
+
+    @staticmethod
+    def remove_object(obj):
+        _TWidgetManager()._unindex_object(obj)
+
+    def _index_widget(self, widget, z_depth: int):
+        self._widget_depth[widget] = z_depth
+        for obj in widget.interface_objects():
+            self._index_object(obj, z_depth)
+        for c in widget.children:
+            self._index_widget(c, z_depth)
+
+    def _unindex_widget(self, widget):
+        self._widget_depth.pop(widget, None)
+        for obj in widget.interface_objects():
+            self._unindex_object(obj)
+        for c in widget.children:
+            self._unindex_widget(c)
+
+    def _index_object(self, obj, z_depth: int):
+        if self._object_depth.get(obj, z_depth) != z_depth:
+            self._unindex_object(obj)
+
+        geometry = obj.geometry
+        rect = Rect(geometry.x, geometry.y, geometry.w, geometry.h)
+
+        if z_depth not in self._indices:
+            self._indices[z_depth] = SpatialHash(
+                settings.get_setting('interface_cell_size', 64)
+            )
+        self._indices[z_depth].insert(obj, rect)
+
+        self._object_depth[obj] = z_depth
+        self._rects[obj] = rect
+        if obj not in self._order:
+            self._order[obj] = next(self._sequence)
+
+    def _unindex_object(self, obj):
+        z_depth = self._object_depth.pop(obj, None)
+        if z_depth is None:
+            return
+
+        self._indices[z_depth].remove(obj)
+        del self._rects[obj]
+        del self._order[obj]
+
+    def hit_test(self, x: (int, float), y: (int, float)) -> list:
+        """
+        :return: list[_AbstractInterfaceObject] under a point, top-down
+        """
+        position = Position(x, y)
+        hits = []
+        for z_depth in reversed(self._depths):
+            index = self._indices.get(z_depth)
+            if index is None:
+                continue
+
+            found = [
+                obj for obj in index.query_point(x, y)
+                if self._rects[obj].contains(position)
+            ]
+            found.sort(key=self._order.__getitem__)
+            hits.extend(found)
+        return hits
 
     def _on_mouse_press(self, x, y, button, modifiers):
         """
-        When the mouse is pressed, we walk through our widgets (top-down) and
-        see if one of them consumes our click
+        When the mouse is pressed, we offer it to the objects under it
+        (top-down) and see if one of them consumes our click
         """
         event = MouseEvent(x, y, button, modifiers)
-        for i in sorted(self._known_widgets.keys(), reverse=True):
-            widgets = self._known_widgets[i]
-            for w in widgets:
-                if w.on_mouse_press(event):
-                    return # Consumed!
+        for obj in self.hit_test(x, y):
+            if obj.on_mouse_press(event):
+                return # Consumed!
 
 class TWidget(TObject):
     """
@@ -146,7 +294,16 @@ class TWidget(TObject):
         }
         self._visible = False
         self._z_depth = 0
-        self._dirty = False
+
+        #
+        # Each widget retains the geometry of it's own objects (not
+        # it's children) in it's own ShapeElementList and SpriteList.
+        # The render engine draws these in tree order so a change only
+        # regenerates the widget it happened in. Built on the first draw
+        #
+        self._dirty = True
+        self._shape_list = None
+        self._sprite_list = None
 
         # Widget tree
         self._parent = parent
@@ -189,7 +346,14 @@ class TWidget(TObject):
         :param position: The new, global, position
         """
         self._position = position
-        self.set_dirty(True)
+
+        # Our children are placed relative to us
+        self._set_tree_dirty()
+        _TWidgetManager.update_widget(self)
+
+    @property
+    def visible(self):
+        return self._visible
 
     @property
     def dirty(self):
@@ -198,14 +362,35 @@ class TWidget(TObject):
     def set_dirty(self, dirty):
         self._dirty = dirty
 
+    def _set_tree_dirty(self):
+        self.set_dirty(True)
+        for c in self._children:
+            c._set_tree_dirty()
+
     @property
     def z_depth(self):
         return self._z_depth
 
     def set_z_depth(self, z_depth):
-        _TWidgetManager.deregister_widget(self)
+        registered = _TWidgetManager.is_registered(self)
+        if registered:
+            _TWidgetManager.deregister_widget(self)
+
         self._z_depth = z_depth
-        _TWidgetManager.register_widget(self)
+
+        if registered:
+            _TWidgetManager.register_widget(self)
+
+    def interface_objects(self) -> list:
+        """
+        :return: list[_AbstractInterfaceObject] this widget holds (not
+        including children), each only once
+        """
+        found = {}
+        for key in self._objects:
+            for obj in self._objects[key]:
+                found[obj] = None
+        return list(found)
 
     def add_object(self, obj: _AbstractInterfaceObject):
         """
@@ -220,6 +405,9 @@ class TWidget(TObject):
         if obj.draw_method() & _AbstractDrawObject.PAINT_BASED:
             self._objects['paint'].append(obj)
 
+        self.set_dirty(True)
+        _TWidgetManager.add_object(self, obj)
+
     def remove_object(self, obj: _AbstractInterfaceObject):
         """
         Remove an object from this widget
@@ -237,6 +425,10 @@ class TWidget(TObject):
         except ValueError as e:
             pass
 
+        self.set_dirty(True)
+        _TWidgetManager.remove_object(obj)
+        obj.release_sprite()
+
     def _set_parent(self, parent):
         """
         Set the parent of this widget. This is protected for now
@@ -257,6 +449,7 @@ class TWidget(TObject):
         """
         widget._set_parent(self)
         self._children.append(widget)
+        _TWidgetManager.add_child(self, widget)
 
     def on_mouse_press(self, mouse_event: MouseEvent):
         """
@@ -280,50 +473,82 @@ class TWidget(TObject):
         return False # Nothing was clicked
 
     def show(self):
-        self._visible = True
         _TWidgetManager.register_widget(self)
-        for c in self._children:
-            c._visible = True
-        self.set_dirty(True)
+        self._set_visible(True)
 
     def hide(self):
-        self._visible = False
         _TWidgetManager.deregister_widget(self)
+        self._set_visible(False)
+
+    def _set_visible(self, visible: bool):
+        """
+        Show/Hide this widget and all of it's children. Anything that
+        changed while hidden is still flagged dirty when we come back.
+        """
+        self._visible = visible
         for c in self._children:
-            c._visible = False
-        self.set_dirty(True) # Have to make sure it's cleared our
+            c._set_visible(visible)
 
     def sprites(self, draw_event):
         """
-        Get all sprites this widgets holds onto
+        Get all sprites this widget holds onto (not including children)
         """
         sprites = []
-        if self._visible:
-            for item in self._objects['sprite']:
-                d = item.sprite()
-                if isinstance(d, (list, tuple)):
-                    sprites.extend(d)
-                else:
-                    sprites.append(d)
-
-        emap(lambda x: sprites.extend(x.sprites(draw_event)), self._children)
-
+        for item in self._objects['sprite']:
+            d = item.sprite()
+            if isinstance(d, (list, tuple)):
+                sprites.extend(d)
+            else:
+                sprites.append(d)
         return sprites
 
     def shapes(self, draw_event):
         """
-        Obtain all shapes this widget holds on to so we may render in batch.
+        Obtain all shapes this widget holds on to (not including children)
+        so we may render in batch.
         :param draw_event: The DrawEvent object that we pass along
-        :return: None
+        :return: list[arcade.Shape]
         """
         shapes = []
-        if self._visible:
-            for shape_item in self._objects['shapes']:
-                shapes.extend(shape_item.shapes(draw_event))
+        for shape_item in self._objects['shapes']:
+            shapes.extend(shape_item.shapes(draw_event))
+        return shapes
 
-        emap(lambda x: shapes.extend(x.shapes(draw_event)), self._children)
+    @property
+    def shape_list(self) -> arcade.ShapeElementList:
+        """
+        :return: Our shapes as of our last rebuild()
+        """
+        return self._shape_list
 
-        return shapes
+    @property
+    def sprite_list(self) -> arcade.SpriteList:
+        """
+        :return: Our sprites as of our last rebuild()
+        """
+        return self._sprite_list
+
+    def rebuild(self, draw_event):
+        """
+        Regenerate our retained shapes, and our sprites if they've
+        changed
+        :param draw_event: The DrawEvent object that we pass along
+        :return: None
+        """
+        self._shape_list = arcade.ShapeElementList()
+        emap(self._shape_list.append, self.shapes(draw_event))
+
+        sprites = self.sprites(draw_event)
+        if self._sprite_list is None or sprites != self._sprite_list.sprite_list:
+            if self._sprite_list is not None:
+                for sprite in self._sprite_list:
+                    # Make sure the sprite forgets about the list we're dropping
+                    sprite.sprite_lists.remove(self._sprite_list)
+
+            self._sprite_list = arcade.SpriteList(use_spatial_hash=False)
+            emap(self._sprite_list.append, sprites)
+
+        self.set_dirty(False)
 
     def paint(self, draw_event):
         """
@@ -333,4 +558,4 @@ class TWidget(TObject):
             return
 
         for item in self._objects['paint']:
-            item.paint(draw_event)
\ No newline at end of file
+            item.paint(draw_event)
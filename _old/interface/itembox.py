@@ -52,3 +52,11 @@ class ItemBox(_AbstractInterfaceObject):
             pass
 
         return [self._box]
+
+    def release_sprite(self):
+        """
+        Hand our box's textures back when we're taken off a widget
+        """
+        if self._box is not None:
+            self._box.release_textures()
+            self._box = None
@@ -0,0 +1,91 @@
+"""
+Tests for projectiles landing on hulls
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import arcade
+import PIL.Image
+import pytest
+
+from ..core.utils import Position, Rect
+from ..core.damage import Damage
+from ..core.collision import CollisionEngine
+from ..core.projectile import _ProjectileBatch, ProjectileEngine
+
+
+def _texture(name, size) -> arcade.Texture:
+    return arcade.Texture(
+        name, PIL.Image.new('RGBA', (size, size), (255, 255, 255, 255))
+    )
+
+
+class _Hull(object):
+    """
+    The least a CollisionEngine needs from something it can hit
+    """
+    def __init__(self, x, y, size=20):
+        self._sprite = arcade.Sprite(center_x=x, center_y=y)
+        self._sprite.texture = _texture('test-hull', size)
+        self.damage = []
+
+    def bounds(self):
+        s = self._sprite
+        return Rect(
+            s.center_x - s.width / 2, s.center_y - s.height / 2,
+            s.width, s.height
+        )
+
+    def sprite(self):
+        return self._sprite
+
+    def take_damage(self, damage: Damage):
+        self.damage.append(damage)
+
+
+class _Hardpoint(object):
+    def __init__(self, ship):
+        self.ship = ship
+
+
+@pytest.fixture
+def batch():
+    engine = ProjectileEngine()
+    batch = _ProjectileBatch(_texture('test-bullet', 4), 1.0)
+    engine.batches['test-bullet'] = batch
+    yield batch
+    engine.batches.pop('test-bullet')
+    collision = CollisionEngine()
+    for hull in list(collision._hulls):
+        collision.remove_hull(hull)
+
+
+def test_projectile_inside_a_hull_deals_damage(batch):
+    hull = _Hull(100, 100)
+    CollisionEngine().add_hull(hull)
+
+    batch.spawn(Position(102, 98), 0, 10, 100, 7, -1)
+    batch.spawn(Position(300, 300), 0, 10, 100, 7, -1)
+    CollisionEngine().update(0)
+
+    assert len(hull.damage) == 1
+    assert hull.damage[0].type_ == Damage.PIERCE
+    assert hull.damage[0].amount == 7
+
+    # The hit is used up, the miss flies on
+    assert batch.count == 1
+    assert batch.position[0].tolist() == [300, 300]
+
+def test_projectiles_pass_through_their_own_ship(batch):
+    hull = _Hull(100, 100)
+    hardpoint = _Hardpoint(hull)
+    CollisionEngine().add_hull(hull)
+
+    owner_id = ProjectileEngine()._owner_id(hardpoint)
+    batch.spawn(Position(100, 100), 0, 10, 100, 7, owner_id)
+    CollisionEngine().update(0)
+
+    assert hull.damage == []
+    assert batch.count == 1
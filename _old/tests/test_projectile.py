@@ -0,0 +1,196 @@
+"""
+Tests for the structure of arrays projectile storage
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import gc
+import math
+import array
+
+import arcade
+import numpy
+import PIL.Image
+
+from ..core.utils import Position
+from ..core.projectile import _ProjectileBatch, ProjectileEngine
+
+
+def _batch() -> _ProjectileBatch:
+    texture = arcade.Texture(
+        'test-bullet', PIL.Image.new('RGBA', (4, 4), (255, 255, 255, 255))
+    )
+    return _ProjectileBatch(texture, 1.0)
+
+def _spawn(batch, x, range_=100, owner_id=0, angle=0, speed=10):
+    batch.spawn(Position(x, 0), angle, speed, range_, 5, owner_id)
+
+
+def test_spawn_packs_into_the_front():
+    batch = _batch()
+    _spawn(batch, 1, owner_id=3)
+    _spawn(batch, 2, owner_id=4)
+
+    assert batch.count == 2
+    assert batch.position[:2].tolist() == [[1, 0], [2, 0]]
+    assert batch.previous[:2].tolist() == [[1, 0], [2, 0]]
+    assert batch.owner[:2].tolist() == [3, 4]
+
+def test_spawn_heads_along_the_angle():
+    batch = _batch()
+    _spawn(batch, 0, angle=0, speed=10)
+    _spawn(batch, 0, angle=90, speed=10)
+
+    numpy.testing.assert_allclose(
+        batch.velocity[:2], [[0, 10], [-10, 0]], atol=1e-9
+    )
+
+def test_spawn_grows_past_capacity():
+    batch = _batch()
+    total = _ProjectileBatch.GROWTH + 1
+    for i in range(total):
+        _spawn(batch, i, owner_id=i)
+
+    assert batch.count == total
+    assert batch.position[:total, 0].tolist() == list(range(total))
+    assert batch.owner[:total].tolist() == list(range(total))
+
+def test_step_moves_and_drops_spent_projectiles():
+    batch = _batch()
+    _spawn(batch, 0, range_=15, owner_id=0)
+    _spawn(batch, 1, range_=5, owner_id=1)
+    _spawn(batch, 2, range_=15, owner_id=2)
+
+    batch.step(1.0)
+
+    # The middle one has gone past it's range
+    assert batch.count == 2
+    assert batch.owner[:2].tolist() == [0, 2]
+    assert batch.position[:2].tolist() == [[0, 10], [2, 10]]
+    assert batch.previous[:2].tolist() == [[0, 0], [2, 0]]
+    assert batch.traveled[:2].tolist() == [10, 10]
+
+def test_step_scales_with_factor():
+    batch = _batch()
+    _spawn(batch, 0)
+    batch.step(0.5)
+    assert batch.position[0].tolist() == [0, 5]
+
+def test_kill_keeps_survivors_in_order():
+    batch = _batch()
+    for i in range(5):
+        _spawn(batch, i, owner_id=i)
+
+    batch.kill([0, 3])
+
+    assert batch.count == 3
+    assert batch.owner[:3].tolist() == [1, 2, 4]
+    assert batch.position[:3, 0].tolist() == [1, 2, 4]
+
+def test_retain_everything_is_a_no_op():
+    batch = _batch()
+    _spawn(batch, 0)
+    _spawn(batch, 1)
+    batch.retain(numpy.ones(2, dtype=bool))
+    assert batch.count == 2
+
+
+def _build_buffers(batch):
+    """
+    Stand in for SpriteList._calculate_sprite_buffer() (which needs a GL
+    context) - flat arrays built from each sprite's attributes
+    """
+    sprites = batch._sprites
+    sprites._sprite_pos_data = array.array('f')
+    sprites._sprite_angle_data = array.array('f')
+    sprites._sprite_color_data = array.array('B')
+    for sprite in sprites.sprite_list:
+        sprites._sprite_pos_data.extend([sprite.center_x, sprite.center_y])
+        sprites._sprite_angle_data.append(math.radians(sprite.angle))
+        sprites._sprite_color_data.extend(list(sprite.color[:3]) + [sprite.alpha])
+    sprites._vao1 = object()
+
+def test_write_sets_sprites_before_buffers_exist():
+    batch = _batch()
+    _spawn(batch, 3, angle=90)
+    batch.write()
+
+    assert not batch._buffers_ready()
+    live, hidden = batch._pool[0], batch._pool[1]
+    assert (live.center_x, live.center_y, live.angle) == (3, 0, 90)
+    assert live.alpha == 255
+    assert hidden.alpha == 0
+
+def test_write_fills_buffers_once_built():
+    batch = _batch()
+    _spawn(batch, 1, angle=90)
+    _spawn(batch, 2)
+    batch.write()
+    _build_buffers(batch)
+
+    batch.step(1.0)
+    batch.write(0.5)
+
+    positions, angles, colors = batch._buffers()
+    numpy.testing.assert_allclose(positions[:2], [[-4, 0], [2, 5]])
+    numpy.testing.assert_allclose(angles[:2], [math.pi / 2, 0], atol=1e-6)
+    assert colors[:3, 3].tolist() == [255, 255, 0]
+    assert batch._sprites._sprite_pos_changed
+
+def test_write_hides_dropped_slots_in_buffers():
+    batch = _batch()
+    for i in range(3):
+        _spawn(batch, i)
+    batch.write()
+    _build_buffers(batch)
+
+    batch.kill([0])
+    batch.write()
+
+    _, _, colors = batch._buffers()
+    assert colors[:3, 3].tolist() == [255, 255, 0]
+
+def test_growing_falls_back_to_sprites():
+    batch = _batch()
+    _spawn(batch, 0)
+    batch.write()
+    _build_buffers(batch)
+
+    # Appending to the SpriteList throws away it's buffers
+    for i in range(_ProjectileBatch.GROWTH):
+        _spawn(batch, i)
+    batch._sprites._vao1 = None
+    batch.write()
+
+    assert batch._slots is None
+    assert all(sprite.alpha == 255 for sprite in batch._pool[:batch.count])
+    assert all(sprite.alpha == 0 for sprite in batch._pool[batch.count:])
+
+
+class _Owner(object):
+    pass
+
+def test_owners_are_held_weakly():
+    engine = ProjectileEngine()
+    owner = _Owner()
+
+    owner_id = engine._owner_id(owner)
+    assert engine._owner_id(owner) == owner_id
+    assert engine.owner(owner_id) is owner
+
+    del owner
+    gc.collect()
+    assert engine.owner(owner_id) is None
+
+def test_owner_ids_are_not_reused():
+    engine = ProjectileEngine()
+    first = _Owner()
+    first_id = engine._owner_id(first)
+
+    del first
+    gc.collect()
+
+    second = _Owner()
+    assert engine._owner_id(second) != first_id
@@ -0,0 +1,136 @@
+"""
+Tests for the PrototypeCache invalidation rules
+"""
+
+import os
+
+from ..core.protocache import PrototypeCache
+
+
+class _Validator(object):
+    """
+    Counts the times a prototype is actually validated
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, info):
+        self.calls += 1
+        return info
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return str(path)
+
+def _reload(cache) -> PrototypeCache:
+    cache.save()
+    return PrototypeCache(cache.cache_file)
+
+
+def test_unchanged_files_skip_validation(tmp_path):
+    source = _write(tmp_path / 'a.si', 'name: a\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+
+    validate = _Validator()
+    assert cache.fetch(source, validate) == {'name': 'a'}
+    assert validate.calls == 1
+
+    cache = _reload(cache)
+    assert cache.is_fresh(source)
+    assert cache.fetch(source, validate) == {'name': 'a'}
+    assert validate.calls == 1
+
+def test_edited_files_are_validated_again(tmp_path):
+    source = _write(tmp_path / 'a.si', 'name: a\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+    validate = _Validator()
+    cache.fetch(source, validate)
+
+    _write(source, 'name: changed\n')
+    cache = _reload(cache)
+    assert not cache.is_fresh(source)
+    assert cache.fetch(source, validate) == {'name': 'changed'}
+    assert validate.calls == 2
+
+def test_touched_files_keep_their_data(tmp_path):
+    source = _write(tmp_path / 'a.si', 'name: a\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+    validate = _Validator()
+    cache.fetch(source, validate)
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    cache = _reload(cache)
+    assert not cache.is_fresh(source)
+    assert cache.fetch(source, validate) == {'name': 'a'}
+    assert validate.calls == 1
+
+def test_changed_prototype_dependency_invalidates(tmp_path):
+    hardpoints = _write(tmp_path / 'hardpoints.si', '- name: basic\n')
+    ship = _write(tmp_path / 'ship.si', 'default: basic\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+
+    validate_ship = _Validator()
+    cache.fetch(hardpoints, _Validator())
+    cache.fetch(ship, validate_ship, lambda info: [hardpoints])
+
+    # Unchanged - nothing to do
+    cache = _reload(cache)
+    cache.fetch(hardpoints, _Validator())
+    cache.fetch(ship, validate_ship, lambda info: [hardpoints])
+    assert validate_ship.calls == 1
+
+    # The ship itself hasn't changed but what it refers to has
+    _write(hardpoints, '- name: renamed\n')
+    cache = _reload(cache)
+    cache.fetch(hardpoints, _Validator())
+    cache.fetch(ship, validate_ship, lambda info: [hardpoints])
+    assert validate_ship.calls == 2
+
+def test_missing_prototype_dependency_invalidates(tmp_path):
+    hardpoints = _write(tmp_path / 'hardpoints.si', '- name: basic\n')
+    ship = _write(tmp_path / 'ship.si', 'default: basic\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+
+    validate_ship = _Validator()
+    cache.fetch(hardpoints, _Validator())
+    cache.fetch(ship, validate_ship, lambda info: [hardpoints])
+
+    # A stale entry for the removed file must not count
+    os.remove(hardpoints)
+    cache = _reload(cache)
+    cache.fetch(ship, validate_ship, lambda info: [hardpoints])
+    assert validate_ship.calls == 2
+
+def test_missing_asset_dependency_invalidates(tmp_path):
+    sprite = _write(tmp_path / 'static.png', '')
+    ship = _write(tmp_path / 'ship.si', 'name: ship\n')
+    cache = PrototypeCache(str(tmp_path / 'protos.cache'))
+
+    validate = _Validator()
+    cache.fetch(ship, validate, lambda info: [sprite])
+
+    cache = _reload(cache)
+    cache.fetch(ship, validate, lambda info: [sprite])
+    assert validate.calls == 1
+
+    os.remove(sprite)
+    cache = _reload(cache)
+    cache.fetch(ship, validate, lambda info: [sprite])
+    assert validate.calls == 2
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    cache_file = _write(tmp_path / 'protos.cache', 'not a pickle')
+    source = _write(tmp_path / 'a.si', 'name: a\n')
+
+    validate = _Validator()
+    cache = PrototypeCache(cache_file)
+    assert cache.fetch(source, validate) == {'name': 'a'}
+    assert validate.calls == 1
+
+    cache = _reload(cache)
+    cache.fetch(source, validate)
+    assert validate.calls == 1
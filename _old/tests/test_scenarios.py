@@ -0,0 +1,33 @@
+"""
+Smoke tests for the headless bench scenarios
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import pytest
+
+from ..bench.scenarios import SCENARIOS, load_components, run_scenario
+from ..core.collision import CollisionEngine
+from ..core.projectile import ProjectileEngine
+
+FIRING = [name for name, (_, firing) in SCENARIOS.items() if firing]
+
+
+@pytest.fixture(scope='module')
+def components():
+    load_components()
+
+
+@pytest.mark.parametrize('name', FIRING)
+def test_firing_scenario_steps(components, name):
+    ship_count, firing = SCENARIOS[name]
+    result = run_scenario(name, ship_count, firing, ticks=10)
+
+    assert result['ticks'] == 10
+    assert result['p99_ms'] >= result['p50_ms']
+
+    # Everything is cleaned up after
+    assert len(CollisionEngine().grid) == 0
+    assert not ProjectileEngine().batches
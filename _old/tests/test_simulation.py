@@ -0,0 +1,114 @@
+"""
+Tests for the fixed timestep of the Simulation
+"""
+
+import pyglet
+# Don't create a hidden GL context when arcade is imported
+pyglet.options['shadow_window'] = False
+
+import pytest
+
+from ..core import settings
+from ..core.utils import Position
+from ..core.ship import Ship
+from ..core.simulation import Simulation
+
+
+class _Ship(object):
+    """
+    Records what the simulation asks of it
+    """
+    def __init__(self):
+        self.steps = []
+        self.alphas = []
+
+    def update(self, delta_time):
+        self.steps.append(delta_time)
+
+    def interpolate(self, alpha):
+        self.alphas.append(alpha)
+
+
+@pytest.fixture
+def simulation():
+    # Quarter second steps keep the arithmetic exact
+    settings.set_setting('sim_rate', 4)
+    yield Simulation()
+    settings.set_setting('sim_rate', Simulation.DEFAULT_RATE)
+
+
+def test_step_time_follows_the_setting(simulation):
+    assert simulation.step_time == 0.25
+
+def test_short_frames_accumulate(simulation):
+    ship = _Ship()
+    simulation.add_ship(ship)
+
+    assert simulation.advance(0.125) == 0
+    assert simulation.alpha == 0.5
+    assert ship.steps == []
+
+    assert simulation.advance(0.125) == 1
+    assert simulation.alpha == 0.0
+    assert ship.steps == [0.25]
+    assert simulation.ticks == 1
+
+def test_long_frames_take_many_fixed_steps(simulation):
+    ship = _Ship()
+    simulation.add_ship(ship)
+
+    assert simulation.advance(0.875) == 3
+    assert ship.steps == [0.25, 0.25, 0.25]
+    assert simulation.alpha == 0.5
+
+def test_catching_up_is_capped(simulation):
+    ship = _Ship()
+    simulation.add_ship(ship)
+
+    # A long hitch only runs MAX_STEPS and drops the rest of the time
+    assert simulation.advance(10.0) == Simulation.MAX_STEPS
+    assert len(ship.steps) == Simulation.MAX_STEPS
+    assert simulation.alpha == 1.0
+
+    # ... rather than spiralling on the next frame
+    assert simulation.advance(0.0) == 1
+    assert simulation.alpha == 0.0
+
+def test_interpolate_passes_alpha_to_ships(simulation):
+    ship = _Ship()
+    simulation.add_ship(ship)
+
+    simulation.advance(0.375)
+    simulation.interpolate()
+    assert ship.alphas == [0.5]
+
+def test_removed_ships_are_not_stepped(simulation):
+    ship = _Ship()
+    simulation.add_ship(ship)
+    simulation.remove_ship(ship)
+
+    simulation.advance(0.25)
+    assert ship.steps == []
+    assert len(simulation) == 0
+
+
+def test_interpolating_leaves_mounts_on_the_step(simulation):
+    from ..bench.scenarios import load_components
+    load_components()
+
+    ship = Ship.new_ship('Skalk', position=Position(0, 0))
+    simulation.add_ship(ship)
+    ship.set_thrust(Position(0, 1))
+    ship.set_angle_delta(3)
+
+    simulation.advance(0.25)
+    hardpoints = [sh.hardpoint for sh in ship.hardpoints if sh.hardpoint]
+    stepped = [(h.position.x, h.position.y) for h in hardpoints]
+
+    simulation.advance(0.125)
+    simulation.interpolate()
+
+    # Only the sprites move between steps, we still fire from the step
+    assert [(h.position.x, h.position.y) for h in hardpoints] == stepped
+
+    simulation.clear()
@@ -0,0 +1,71 @@
+"""
+Tests for the SpatialHash broad phase
+"""
+
+from ..core.utils import Rect
+from ..core.spatial import SpatialHash
+
+
+def test_cell_of_floors_negative_coordinates():
+    grid = SpatialHash(10)
+    assert grid.cell_of(0, 0) == (0, 0)
+    assert grid.cell_of(9.9, 10) == (0, 1)
+    assert grid.cell_of(-0.1, -10.1) == (-1, -2)
+
+def test_insert_covers_every_overlapped_cell():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(5, 5, 10, 10))
+
+    assert 'a' in grid
+    assert len(grid) == 1
+    assert set(grid.cells()) == {(0, 0), (0, 1), (1, 0), (1, 1)}
+
+def test_query_point_and_rect():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(0, 0, 5, 5))
+    grid.insert('b', Rect(25, 25, 5, 5))
+
+    assert grid.query_point(1, 1) == {'a'}
+    assert grid.query_point(50, 50) == ()
+    assert grid.query(Rect(0, 0, 30, 30)) == {'a', 'b'}
+    assert grid.query(Rect(40, 40, 5, 5)) == set()
+
+def test_move_updates_cells():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(0, 0, 5, 5))
+    grid.move('a', Rect(100, 100, 5, 5))
+
+    assert grid.query_point(1, 1) == ()
+    assert grid.query_point(101, 101) == {'a'}
+    assert set(grid.cells()) == {(10, 10)}
+
+def test_insert_twice_moves():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(0, 0, 5, 5))
+    grid.insert('a', Rect(50, 0, 5, 5))
+
+    assert len(grid) == 1
+    assert grid.query_point(1, 1) == ()
+    assert grid.query_point(51, 1) == {'a'}
+
+def test_remove_drops_empty_cells():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(0, 0, 5, 5))
+    grid.insert('b', Rect(0, 0, 5, 5))
+
+    grid.remove('a')
+    assert grid.query_point(1, 1) == {'b'}
+
+    grid.remove('b')
+    assert 'b' not in grid
+    assert not list(grid.cells())
+
+    # Unknown objects are ignored
+    grid.remove('c')
+
+def test_clear():
+    grid = SpatialHash(10)
+    grid.insert('a', Rect(0, 0, 5, 5))
+    grid.clear()
+    assert len(grid) == 0
+    assert not list(grid.cells())
@@ -0,0 +1,175 @@
+"""
+Tests for TSignal listeners and the frame coalesced EventQueue
+"""
+
+import gc
+import functools
+
+from ..core.tobject import TObject, TSignal, EventQueue
+
+
+class _Sender(TObject):
+    @TSignal.queued
+    def hit(self, value):
+        self.calls.append(value)
+
+    @TSignal
+    def changed(self, value):
+        pass
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+
+class _Receiver(object):
+    def __init__(self):
+        self.values = []
+
+    def on_value(self, value):
+        self.values.append(value)
+
+
+def _queue() -> EventQueue:
+    queue = EventQueue()
+    queue.drain() # Nothing left over from another test
+    return queue
+
+
+def test_queued_post_events_wait_for_drain():
+    queue = _queue()
+    sender, receiver = _Sender(), _Receiver()
+    sender.hit.listen_post(receiver.on_value)
+
+    sender.hit(1)
+
+    # The function itself runs right away
+    assert sender.calls == [1]
+    assert receiver.values == []
+    assert len(queue) == 1
+
+    queue.drain()
+    assert receiver.values == [1]
+    assert len(queue) == 0
+
+def test_posts_coalesce_to_the_latest_arguments():
+    queue = _queue()
+    sender, receiver = _Sender(), _Receiver()
+    sender.hit.listen_post(receiver.on_value)
+
+    sender.hit(1)
+    sender.hit(2)
+    sender.hit(3)
+
+    assert sender.calls == [1, 2, 3]
+    assert len(queue) == 1
+
+    queue.drain()
+    assert receiver.values == [3]
+
+def test_posts_are_kept_per_sender():
+    queue = _queue()
+    first, second = _Sender(), _Sender()
+    receiver = _Receiver()
+    first.hit.listen_post(receiver.on_value)
+    second.hit.listen_post(receiver.on_value)
+
+    first.hit('a')
+    second.hit('b')
+    first.hit('c')
+
+    assert len(queue) == 2
+    queue.drain()
+    assert sorted(receiver.values) == ['b', 'c']
+
+def test_pre_events_are_not_queued():
+    queue = _queue()
+    sender, receiver = _Sender(), _Receiver()
+    sender.hit.listen_pre(receiver.on_value)
+
+    sender.hit(1)
+    sender.hit(2)
+    assert receiver.values == [1, 2]
+    queue.drain()
+
+def test_unqueued_signals_dispatch_right_away():
+    queue = _queue()
+    sender, receiver = _Sender(), _Receiver()
+    sender.changed.listen_post(receiver.on_value)
+
+    sender.changed(1)
+    assert receiver.values == [1]
+    assert len(queue) == 0
+
+def test_events_posted_while_draining_are_handled():
+    queue = _queue()
+    first, second = _Sender(), _Sender()
+    receiver = _Receiver()
+    first.hit.listen_post(lambda value: second.hit(value + 1))
+    second.hit.listen_post(receiver.on_value)
+
+    first.hit(1)
+    queue.drain()
+    assert receiver.values == [2]
+
+def test_drain_stops_a_signal_loop():
+    queue = _queue()
+    sender = _Sender()
+    sender.hit.listen_post(lambda value: sender.hit(value + 1))
+
+    sender.hit(0)
+    queue.drain()
+
+    # One call per pass and the loop is still pending
+    assert len(sender.calls) == EventQueue.MAX_PASSES + 1
+    assert len(queue) == 1
+    queue._events.clear()
+
+
+def test_listener_drops_out_with_its_owner():
+    sender, receiver = _Sender(), _Receiver()
+    sender.changed.listen_post(receiver.on_value)
+    assert len(sender.changed._post_events) == 1
+
+    del receiver
+    gc.collect()
+
+    assert len(sender.changed._post_events) == 0
+    sender.changed(1) # Nobody left to hear it
+
+def test_stop_listening_on_a_bound_method():
+    sender, receiver = _Sender(), _Receiver()
+    sender.changed.listen_pre(receiver.on_value)
+    sender.changed.listen_post(receiver.on_value)
+
+    # A fresh bound method each access, but the same listener
+    sender.changed.stop_listening(receiver.on_value)
+
+    sender.changed(1)
+    assert receiver.values == []
+
+def test_stop_listening_on_a_lambda():
+    sender = _Sender()
+    values = []
+    listener = lambda value: values.append(value)
+    sender.changed.listen_post(listener)
+
+    sender.changed(1)
+    sender.changed.stop_listening(listener)
+    sender.changed(2)
+    assert values == [1]
+
+def test_functions_and_partials_are_kept_alive():
+    sender = _Sender()
+    values = []
+
+    def on_value(value):
+        values.append(value)
+
+    sender.changed.listen_post(on_value)
+    sender.changed.listen_pre(functools.partial(on_value))
+    del on_value
+    gc.collect()
+
+    sender.changed(1)
+    assert values == [1, 1]